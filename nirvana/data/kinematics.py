@@ -6,8 +6,6 @@ model.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
-
 import numpy as np
 from scipy import sparse
 from scipy import linalg
@@ -162,6 +160,13 @@ class Kinematics(FitArgs):
         bordermask (`numpy.ndarray`_):
             Boolean array containing the mask for a ring around the outside of
             the data. Meant to mask bad data from convolution errors.
+        image (`numpy.ndarray`_, :obj:`str`, optional):
+            An image of the galaxy (e.g., a finding chart) only used for
+            plotting.  If a string is provided, it is the name of the image
+            file, which is only read when :attr:`image` is first accessed
+            (or when the object is pickled).  This means a missing or
+            unreadable file raises an error when the image is first used
+            (e.g., when plotting), not when the object is instantiated.
         phot_inc (:obj:`float`, optional):
             Photometric inclination in degrees.
         maxr (:obj:`float`, optional):
@@ -217,16 +222,9 @@ class Kinematics(FitArgs):
         # should put in the relevant model class/method
         self.bordermask = bordermask.astype(bool) if bordermask is not None else None
 
-        # Build coordinate arrays
-        if x is None:
-            # No coordinate arrays provided, so just assume a
-            # coordinate system with 0 at the center. Ensure that
-            # coordinates mimic being "sky-right" (i.e., x increases
-            # toward lower pixel indices).
-            self.x, self.y = map(lambda x : x - self.nimg//2,
-                                 np.meshgrid(np.arange(self.nimg)[::-1], np.arange(self.nimg)))
-        else:
-            self.x, self.y = x, y
+        # Set the coordinate arrays.  If they're not provided, they're
+        # constructed below, after the valid grid cells are determined.
+        self.x, self.y = x, y
 
         # Build map data
         self.sb, self.sb_ivar, self.sb_mask = self._ingest(sb, sb_ivar, sb_mask)
@@ -234,7 +232,9 @@ class Kinematics(FitArgs):
         self.sig, self.sig_ivar, self.sig_mask = self._ingest(sig, sig_ivar, sig_mask)
         # Have to treat sig_corr separately
         if isinstance(sig_corr, np.ma.MaskedArray):
-            self.sig_mask |= np.ma.getmaskarray(sig_corr)
+            # Only incorporate the mask if any values are actually masked
+            if np.ma.is_masked(sig_corr):
+                np.logical_or(self.sig_mask, np.ma.getmaskarray(sig_corr), out=self.sig_mask)
             self.sig_corr = sig_corr.data
         else:
             self.sig_corr = sig_corr
@@ -255,6 +255,17 @@ class Kinematics(FitArgs):
             if getattr(self, attr) is not None:
                 setattr(self, attr, getattr(self, attr).ravel()[self.bin_indx])
 
+        if x is None:
+            # No coordinate arrays provided, so just assume a coordinate system
+            # with 0 at the center. Ensure that coordinates mimic being
+            # "sky-right" (i.e., x increases toward lower pixel indices).
+            # NOTE: The coordinates are computed directly from the flattened
+            # indices of the selected grid cells instead of constructing the
+            # full 2D coordinate grids.
+            row, col = np.divmod(self.bin_indx, self.nimg)
+            self.x = self.nimg - 1 - col - self.nimg//2
+            self.y = row - self.nimg//2
+
         # Set the surface-brightness grid.  This needs to be after the
         # unraveling of the attributes done in the lines above so that I can use
         # self.remap in the case that grid_sb is not provided directly.
@@ -292,6 +303,33 @@ class Kinematics(FitArgs):
         # ivar and covar and they are not consistent
 
 
+    @property
+    def image(self):
+        """
+        Image of the galaxy, read from the image file on first access if
+        the object was instantiated with a file name.  Any error reading
+        the file is raised here.
+        """
+        if isinstance(self._image, str):
+            self._image = plt.imread(self._image)
+        return self._image
+
+    @image.setter
+    def image(self, image):
+        self._image = image
+
+    def __getstate__(self):
+        """
+        Return the object state for pickling.
+
+        The image is read, if it hasn't been already, so that the pickled
+        object (e.g., the output ``.gal`` file) does not depend on the image
+        file still being available.
+        """
+        state = self.__dict__.copy()
+        state['_image'] = self.image
+        return state
+
     def _set_beam(self, psf, aperture):
         """
         Instantiate :attr:`beam` and :attr:`beam_fft`.
@@ -366,11 +404,11 @@ class Kinematics(FitArgs):
             return None, None, None
 
         # Initialize the mask
-        _mask = np.zeros(self.spatial_shape, dtype=bool) if mask is None else mask.copy()
+        _mask = np.zeros(self.spatial_shape, dtype=bool) if mask is None else mask.astype(bool)
 
         # Set the data and incorporate the mask for a masked array
         if isinstance(data, np.ma.MaskedArray):
-            _mask |= np.ma.getmaskarray(data)
+            np.logical_or(_mask, np.ma.getmaskarray(data), out=_mask)
             _data = data.data.astype(np.float64)
         else:
             _data = data.astype(np.float64)
@@ -380,13 +418,16 @@ class Kinematics(FitArgs):
             # Don't instantiate the array if we don't need to.
             _ivar = None
         elif isinstance(ivar, np.ma.MaskedArray):
-            _mask |= np.ma.getmaskarray(ivar)
+            np.logical_or(_mask, np.ma.getmaskarray(ivar), out=_mask)
             _ivar = ivar.data.astype(np.float64)
         else:
             _ivar = ivar.astype(np.float64)
-        # Make sure to mask any measurement with ivar <= 0
+        # Make sure to mask any measurement with ivar <= 0.  NOTE: This
+        # purposely inverts ivar > 0 (in place) instead of using ivar <= 0 so
+        # that NaN values are also masked.
         if _ivar is not None:
-            _mask |= np.logical_not(_ivar > 0)
+            _bpm = _ivar > 0
+            np.logical_or(_mask, np.logical_not(_bpm, out=_bpm), out=_mask)
 
         return _data, _ivar, _mask
 
@@ -417,7 +458,7 @@ class Kinematics(FitArgs):
         if not quiet:
             print('Ingesting covariance matrix ... ')
 
-        nspax = np.prod(self.spatial_shape)
+        nspax = self.spatial_shape[0]*self.spatial_shape[1]
         if covar.shape != (nspax,nspax):
             raise ValueError('Input covariance matrix has incorrect shape: {0}'.format(covar.shape))
 
@@ -529,11 +570,17 @@ class Kinematics(FitArgs):
         # NOTE: np.ma.masked_all sets the initial data array to
         # 2.17506892e-314, which just leads to trouble. I've replaced this with
         # the line below to make sure that the initial value is just 0.
-        _data = np.ma.MaskedArray(np.zeros(self.spatial_shape, dtype=d.dtype), mask=True)
-        _data[np.unravel_index(self.grid_indx, self.spatial_shape)] = d[self.bin_inverse]
-        if m is not None:
-            np.ma.getmaskarray(_data)[np.unravel_index(self.grid_indx, self.spatial_shape)] \
-                    = m[self.bin_inverse]
+        # NOTE: The grid indices are for the flattened map, so fill the
+        # (contiguous) data and mask arrays through flattened views instead of
+        # unraveling the indices into separate row and column arrays.
+        # NOTE: If ``d`` is a masked array, its mask is combined with ``m``.
+        _data = np.zeros(self.spatial_shape, dtype=d.dtype)
+        _data.reshape(-1)[self.grid_indx] = np.ma.getdata(d)[self.bin_inverse]
+        _mask = np.ones(self.spatial_shape, dtype=bool)
+        _mask.reshape(-1)[self.grid_indx] = False if m is None else m[self.bin_inverse]
+        if np.ma.isMaskedArray(d):
+            _mask.reshape(-1)[self.grid_indx] |= np.ma.getmaskarray(d)[self.bin_inverse]
+        _data = np.ma.MaskedArray(_data, mask=_mask)
         # Return a masked array if requested; otherwise, fill the masked values
         # with the equivalent of 0. WARNING: this will be False for a boolean
         # array...
@@ -566,6 +613,12 @@ class Kinematics(FitArgs):
         if data.shape != self.spatial_shape:
             raise ValueError('Data to rebin has incorrect shape; expected {0}, found {1}.'.format(
                               self.spatial_shape, data.shape))
+        # For unbinned data, the bin transform is the identity matrix, so skip
+        # the sparse-matrix multiplication.  Like the binned result, the
+        # returned vector is always a plain (copied) array, even if the input
+        # is masked.
+        if self.binid is None:
+            return np.ma.getdata(data).astype(float).ravel()
         return self.bin_transform.dot(data.ravel())
 
     # TODO: Include an optional weight map.  E.g., to mimic the luminosity
@@ -610,6 +663,11 @@ class Kinematics(FitArgs):
         if deriv.shape[:2] != self.spatial_shape:
             raise ValueError('Derivative shape is incorrect; expected {0}, found {1}.'.format(
                               self.spatial_shape, deriv.shape[:2]))
+        # For unbinned data, the bin transform is the identity matrix, so skip
+        # the sparse-matrix multiplication.
+        if self.binid is None:
+            return np.ma.getdata(data).astype(float).ravel(), \
+                    np.ma.getdata(deriv).astype(float).reshape(-1, deriv.shape[-1])
         return self.bin_transform.dot(data.ravel()), \
                     np.stack(tuple([self.bin_transform.dot(deriv[...,i].ravel())
                                     for i in range(deriv.shape[-1])]), axis=-1)
@@ -648,11 +706,8 @@ class Kinematics(FitArgs):
         Note this not the in-plane disk radius; however, the two are the same
         along the major axis.
         """
-        minx = np.amin(self.x)
-        maxx = np.amax(self.x)
-        miny = np.amin(self.y)
-        maxy = np.amax(self.y)
-        return np.sqrt(max(abs(minx), maxx)**2 + max(abs(miny), maxy)**2)
+        # NOTE: max(abs(min(x)), max(x)) is identical to max(abs(x))
+        return np.hypot(np.amax(np.absolute(self.x)), np.amax(np.absolute(self.y)))
 
     # TODO: This should be in a different method/class
     @classmethod
@@ -738,7 +793,9 @@ class Kinematics(FitArgs):
 
         #convert angles to polar
         _inc,_pa,_pab = np.radians([inc, pa, pab])
-        r, th = projected_polar(x - xc, y - yc, _pa, _inc)
+        #shift the 1D axes and let them broadcast instead of offsetting the
+        #full 2D grids
+        r, th = projected_polar(*np.meshgrid(a - xc, a - yc, sparse=True), _pa, _inc)
 
         #interpolate velocity values for all r 
         bincents = (edges[:-1] + edges[1:])/2
@@ -749,9 +806,10 @@ class Kinematics(FitArgs):
         sb = oned.Sersic1D([1,10,1]).sample(r) #sersic profile for flux
 
         #spekkens and sellwood 2nd order vf model (from andrew's thesis)
-        vel = vsys + np.sin(_inc) * (vtvals * np.cos(th) - 
-              v2tvals * np.cos(2*(th - _pab)) * np.cos(th) -
-              v2rvals * np.sin(2*(th - _pab)) * np.sin(th))
+        #compute each trig term only once and factor out cos(th)
+        th2 = 2*(th - _pab)
+        vel = vsys + np.sin(_inc) * (np.cos(th) * (vtvals - v2tvals * np.cos(th2)) -
+              v2rvals * np.sin(th2) * np.sin(th))
 
         #load example MaNGA PSF if none is provided
         #TODO: construct a general PSF instead
@@ -776,7 +834,7 @@ class Kinematics(FitArgs):
            
         else: _vel, _x, _y, _sig, _sb = [vel, x, y, sig, sb]
 
-        binid = np.arange(np.product(_vel.shape)).reshape(_vel.shape)
+        binid = np.arange(_vel.size).reshape(_vel.shape)
         return cls(_vel, x=_x, y=_y, grid_x=_x, grid_y=_y, reff=reff, binid=binid, sig=_sig, psf=_psf, sb=_sb, bordermask=bordermask)
 
     def reject(self, vel_rej=None, sig_rej=None):
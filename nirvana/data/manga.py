@@ -10,17 +10,15 @@ Module with the derived instances for MaNGA kinematics.
 .. include:: ../include/links.rst
 """
 import os
+import re
 import glob
 import warnings
 import netrc
 
 from pkg_resources import resource_filename
 
-from IPython import embed
-
 import numpy as np
 from scipy import sparse
-import matplotlib.image as img
 
 from astropy.io import fits
 from astropy.wcs import WCS
@@ -55,14 +53,15 @@ def channel_dictionary(hdu, ext, prefix='C'):
         :obj:`dict`: The dictionary that provides the channel index
         associate with the channel name.
     """
+    # Only keep the cards where the keyword is the prefix followed by the
+    # channel number. Iterating over the cards directly avoids constructing
+    # a new header from the wildcard selection.
+    channel_keyword = re.compile(r'^{0}(\d+)$'.format(re.escape(prefix)))
     channel_dict = {}
-    for k, v in hdu[ext].header.items():
-        if k[:len(prefix)] == prefix:
-            try:
-                i = int(k[len(prefix):])-1
-            except ValueError:
-                continue
-            channel_dict[v] = i
+    for card in hdu[ext].header.cards:
+        match = channel_keyword.match(card.keyword)
+        if match is not None:
+            channel_dict[card.value] = int(match.group(1))-1
     return channel_dict
 
 
@@ -232,6 +231,29 @@ def manga_file_names(plate, ifu, daptype='HYB10-MILESHC-MASTARHC2', dr='MPL-11')
                 f'dapall-{drpver}-{dapver}.fits', f'manga-{plate}-{ifu}-MAPS-{daptype}.fits.gz'
 
 
+_MAPS_BINTYPE = re.compile(r'-MAPS-([^-]+)-')
+
+def manga_maps_bintype(maps_file):
+    """
+    Parse the binning type from the name of a DAP MAPS file.
+
+    The DAP MAPS files are named ``manga-{plate}-{ifu}-MAPS-{daptype}``, where
+    the first element of ``daptype`` is the binning type (e.g., ``HYB10`` in
+    ``HYB10-MILESHC-MASTARHC2``).  If the file name does not follow this
+    convention, the binning type is taken to be the third-to-last dash-separated
+    element of the file name (without the extension).
+
+    Args:
+        maps_file (:obj:`str`):
+            Name of the MAPS file, which can include its path.
+
+    Returns:
+        :obj:`str`: The binning type.
+    """
+    match = _MAPS_BINTYPE.search(os.path.basename(maps_file))
+    return maps_file.split('.fits')[0].split('-')[-3] if match is None else match.group(1)
+
+
 def manga_files_from_plateifu(plate, ifu, daptype='HYB10-MILESHC-MASTARHC2', dr='MPL-11',
                               redux_path=None, cube_path=None, image_path=None, analysis_path=None,
                               maps_path=None, check=True, remotedir=None, rawpaths=False):
@@ -824,14 +846,15 @@ def manga_map_covar(ivar, binid=None, rho_sig=1.92, rlim=3.2, min_ivar=1e-10, rh
         return gpm, cov
 
     # Fill out the full covariance matrix so that its size matches the input
-    # map size
-    _cov = sparse.lil_matrix((ivar.size,ivar.size), dtype=float)
-    # NOTE: scipy issues a SparseEfficiencyWarning suggesting the next
-    # operation is more efficient using an lil_matrix instead of a csr_matrix;
-    # that's the reason for the declaration above and the conversion in the
-    # return type...
-    _cov[np.ix_(gpm.ravel(),gpm.ravel())] = cov
-    return gpm, _cov.tocsr()
+    # map size.  The CSR arrays are constructed directly: the rows and columns
+    # of the sub-matrix are mapped to the (sorted) flattened indices of the
+    # good pixels, and the rows for the masked pixels are left empty.
+    cov = cov.tocsr()
+    gindx = np.flatnonzero(gpm)
+    nnz = np.zeros(ivar.size, dtype=int)
+    nnz[gindx] = np.diff(cov.indptr)
+    return gpm, sparse.csr_matrix((cov.data, gindx[cov.indices], np.append(0, np.cumsum(nnz))),
+                                  shape=(ivar.size,ivar.size))
 
 
 class MaNGAKinematics(Kinematics):
@@ -949,7 +972,9 @@ class MaNGAGasKinematics(MaNGAKinematics):
 
         psf_name = None if cube_file is None else psf_ext
         # Get the 3-color galaxy thumbnail image
-        image = None if image_file is None else img.imread(image_file)
+        # NOTE: Only the image file name is passed; the image is read by
+        # Kinematics when it's first used.
+        image = image_file
 
         # Establish whether or not the gas kinematics were determined
         # on a spaxel-by-spaxel basis, which determines which extension
@@ -957,7 +982,7 @@ class MaNGAGasKinematics(MaNGAKinematics):
         # measurement. The binned coordinates are only used if the data
         # is from the `VOR` bin case (which is probably never going to
         # be used with this package, but anyway...)
-        bintype = maps_file.split('.fits')[0].split('-')[-3]
+        bintype = manga_maps_bintype(maps_file)
         coo_ext = 'BIN_LWSKYCOO' if 'VOR' in bintype else 'SPX_SKYCOO'
 
         # NOTE: The gas effectively doesn't have the same choice as the stellar
@@ -973,19 +998,22 @@ class MaNGAGasKinematics(MaNGAKinematics):
             if line not in eml:
                 raise KeyError('{0} does not contain channel {1}.'.format(maps_file, line))
 
+            # NOTE: Use the HDU sections to only read the relevant channel of
+            # the multi-channel extensions, instead of reading (and, for the
+            # gzipped files, decompressing) the full data arrays.
             x = hdu[coo_ext].data[0]
             y = hdu[coo_ext].data[1]
-            binid = hdu['BINID'].data[3]
+            binid = hdu['BINID'].section[3]
             grid_x = hdu['SPX_SKYCOO'].data[0]
             grid_y = hdu['SPX_SKYCOO'].data[1]
-            sb = hdu['EMLINE_GFLUX'].data[eml[line]]
-            sb_ivar = hdu['EMLINE_GFLUX_IVAR'].data[eml[line]]
-            sb_anr = hdu['EMLINE_GANR'].data[eml[line]]
-            vel = hdu['EMLINE_GVEL'].data[eml[line]]
-            vel_ivar = hdu['EMLINE_GVEL_IVAR'].data[eml[line]]
-            sig = hdu['EMLINE_GSIGMA'].data[eml[line]]
-            sig_ivar = hdu['EMLINE_GSIGMA_IVAR'].data[eml[line]]
-            sig_corr = hdu['EMLINE_INSTSIGMA'].data[eml[line]]
+            sb = hdu['EMLINE_GFLUX'].section[eml[line]]
+            sb_ivar = hdu['EMLINE_GFLUX_IVAR'].section[eml[line]]
+            sb_anr = hdu['EMLINE_GANR'].section[eml[line]]
+            vel = hdu['EMLINE_GVEL'].section[eml[line]]
+            vel_ivar = hdu['EMLINE_GVEL_IVAR'].section[eml[line]]
+            sig = hdu['EMLINE_GSIGMA'].section[eml[line]]
+            sig_ivar = hdu['EMLINE_GSIGMA_IVAR'].section[eml[line]]
+            sig_corr = hdu['EMLINE_INSTSIGMA'].section[eml[line]]
 
             # TODO: Not all galaxies have a measured effective radius or
             # ellipticity in the header of the DAP MAPS files. The photometry
@@ -1005,16 +1033,17 @@ class MaNGAGasKinematics(MaNGAKinematics):
                 vel_mask = np.zeros(vel.shape, dtype=bool)
                 sig_mask = np.zeros(sig.shape, dtype=bool)
             elif mask_flags == 'any':
-                sb_mask = hdu['EMLINE_GFLUX_MASK'].data[eml[line]] > 0
-                vel_mask = hdu['EMLINE_GVEL_MASK'].data[eml[line]] > 0
-                sig_mask = hdu['EMLINE_GSIGMA_MASK'].data[eml[line]] > 0
+                # Any set bit (including the sign bit) flags the pixel
+                sb_mask = hdu['EMLINE_GFLUX_MASK'].section[eml[line]].astype(bool)
+                vel_mask = hdu['EMLINE_GVEL_MASK'].section[eml[line]].astype(bool)
+                sig_mask = hdu['EMLINE_GSIGMA_MASK'].section[eml[line]].astype(bool)
             else:
                 bitmask = sdss_bitmask('MANGA_DAPPIXMASK')
-                sb_mask = bitmask.flagged(hdu['EMLINE_GFLUX_MASK'].data[eml[line]],
+                sb_mask = bitmask.flagged(hdu['EMLINE_GFLUX_MASK'].section[eml[line]],
                                           flag=mask_flags)
-                vel_mask = bitmask.flagged(hdu['EMLINE_GVEL_MASK'].data[eml[line]],
+                vel_mask = bitmask.flagged(hdu['EMLINE_GVEL_MASK'].section[eml[line]],
                                            flag=mask_flags)
-                sig_mask = bitmask.flagged(hdu['EMLINE_GSIGMA_MASK'].data[eml[line]],
+                sig_mask = bitmask.flagged(hdu['EMLINE_GSIGMA_MASK'].section[eml[line]],
                                            flag=mask_flags)
 
             # Get the WCS from a single-channel extension
@@ -1124,7 +1153,9 @@ class MaNGAStellarKinematics(MaNGAKinematics):
             if fwhm_only: psf, cube_file = (None, None)
         else: psf, fwhm = (None, None)
         psf_name = None if cube_file is None else psf_ext
-        image = img.imread(image_file) if image_file else None
+        # NOTE: Only the image file name is passed; the image is read by
+        # Kinematics when it's first used.
+        image = image_file if image_file else None
 
         # Establish whether or not the stellar kinematics were
         # determined on a spaxel-by-spaxel basis, which determines
@@ -1133,7 +1164,7 @@ class MaNGAStellarKinematics(MaNGAKinematics):
         # TODO: Actually, the BIN_* extensions are always right for the
         # stellar kinematics. I.e., in the SPX case, the BIN_* and
         # SPX_* extensions are identical.  Leaving it for now...
-        bintype = maps_file.split('.fits')[0].split('-')[-3]
+        bintype = manga_maps_bintype(maps_file)
         coo_ext = 'SPX_SKYCOO' if bintype == 'SPX' else 'BIN_LWSKYCOO'
         flux_ext = 'SPX_MFLUX' if bintype == 'SPX' else 'BIN_MFLUX'
 
@@ -1143,7 +1174,7 @@ class MaNGAStellarKinematics(MaNGAKinematics):
         with fits.open(maps_file) as hdu:
             x = hdu[coo_ext].data[0]
             y = hdu[coo_ext].data[1]
-            binid = hdu['BINID'].data[1]
+            binid = hdu['BINID'].section[1]
             grid_x = hdu['SPX_SKYCOO'].data[0]
             grid_y = hdu['SPX_SKYCOO'].data[1]
             grid_sb = hdu['SPX_MFLUX'].data if unbinned_sb else None
@@ -1156,7 +1187,7 @@ class MaNGAStellarKinematics(MaNGAKinematics):
             vel_ivar = hdu['STELLAR_VEL_IVAR'].data
             sig = hdu['STELLAR_SIGMA'].data
             sig_ivar = hdu['STELLAR_SIGMA_IVAR'].data
-            sig_corr = hdu['STELLAR_SIGMACORR'].data[0]
+            sig_corr = hdu['STELLAR_SIGMACORR'].section[0]
 
             # TODO: Not all galaxies have a measured effective radius or
             # ellipticity in the header of the DAP MAPS files. The photometry
@@ -1175,8 +1206,9 @@ class MaNGAStellarKinematics(MaNGAKinematics):
                 vel_mask = np.zeros(vel.shape, dtype=bool)
                 sig_mask = np.zeros(sig.shape, dtype=bool)
             elif mask_flags == 'any':
-                vel_mask = hdu['STELLAR_VEL_MASK'].data > 0
-                sig_mask = hdu['STELLAR_SIGMA_MASK'].data > 0
+                # Any set bit (including the sign bit) flags the pixel
+                vel_mask = hdu['STELLAR_VEL_MASK'].data.astype(bool)
+                sig_mask = hdu['STELLAR_SIGMA_MASK'].data.astype(bool)
             else:
                 bitmask = sdss_bitmask('MANGA_DAPPIXMASK')
                 vel_mask = bitmask.flagged(hdu['STELLAR_VEL_MASK'].data, flag=mask_flags)
@@ -1280,21 +1312,23 @@ class MaNGAGlobalPar(GlobalPar):
         # Index is always included, regardless of whether or not the rest of
         # the photometric measurements are based on the elliptical Petrosian
         # analysis.
-        indx = indx[0]
-        if drpall['nsa_elpetro_th50_r'][indx] > 0:
+        # NOTE: Only the matched row is used below; accessing its fields
+        # directly avoids converting each full table column.
+        row = drpall[indx[0]]
+        if row['nsa_elpetro_th50_r'] > 0:
             phot_key = 'elpetro'
-            mass = drpall['nsa_elpetro_mass'][indx]
-            pa = drpall['nsa_elpetro_phi'][indx]
-            ell = 1. - drpall['nsa_elpetro_ba'][indx]
-            reff = drpall['nsa_elpetro_th50_r'][indx]
-            sersic_n = drpall['nsa_sersic_n'][indx]
-        elif drpall['nsa_sersic_th50'][indx] > 0:
+            mass = row['nsa_elpetro_mass']
+            pa = row['nsa_elpetro_phi']
+            ell = 1. - row['nsa_elpetro_ba']
+            reff = row['nsa_elpetro_th50_r']
+            sersic_n = row['nsa_sersic_n']
+        elif row['nsa_sersic_th50'] > 0:
             phot_key = 'sersic'
-            mass = drpall['nsa_sersic_mass'][indx]
-            pa = drpall['nsa_sersic_phi'][indx]
-            ell = 1. - drpall['nsa_sersic_ba'][indx]
-            reff = drpall['nsa_sersic_th50'][indx]
-            sersic_n = drpall['nsa_sersic_n'][indx]
+            mass = row['nsa_sersic_mass']
+            pa = row['nsa_sersic_phi']
+            ell = 1. - row['nsa_sersic_ba']
+            reff = row['nsa_sersic_th50']
+            sersic_n = row['nsa_sersic_n']
         else:
             warnings.warn('Photometric data unavailable; adopting bogus defaults.')
             phot_key = None
@@ -1304,27 +1338,27 @@ class MaNGAGlobalPar(GlobalPar):
             reff = 1.0
             sersic_n = 1.0
 
-        z = drpall['z'][indx]
+        z = row['z']
         if z <= 0.:
             warnings.warn('Redshift not available; adopting z=0!')
             z = 0.
 
         # Instantiate the object
-        super().__init__(ra=drpall['objra'][indx], dec=drpall['objdec'][indx], mass=mass, z=z,
+        super().__init__(ra=row['objra'], dec=row['objdec'], mass=mass, z=z,
                          pa=pa, ell=ell, reff=reff, sersic_n=sersic_n, **kwargs)
 
         # Save MaNGA-specific attributes
         self.dr = 'unknown' if dr is None else dr
-        self.mangaid = drpall['mangaid'][indx]
+        self.mangaid = row['mangaid']
         self.plate = plate
         self.ifu = ifu
         self.drpall_file = drpall_file
         self.primaryplus, self.secondary, self.ancillary, self.other \
-                = parse_manga_targeting_bits(drpall['mngtarg1'][indx],
-                                             mngtarg3=drpall['mngtarg3'][indx])
+                = parse_manga_targeting_bits(row['mngtarg1'],
+                                             mngtarg3=row['mngtarg3'])
         self.psf_band = np.array(['g', 'r', 'i', 'z'])
-        self.psf_fwhm = np.array([drpall['gfwhm'][indx], drpall['rfwhm'][indx],
-                                  drpall['ifwhm'][indx], drpall['zfwhm'][indx]])
+        self.psf_fwhm = np.array([row['gfwhm'], row['rfwhm'],
+                                  row['ifwhm'], row['zfwhm']])
 
         # Save some of the measured magnitudes, if they're available
         self.phot_key = phot_key
@@ -1333,8 +1367,7 @@ class MaNGAGlobalPar(GlobalPar):
             self.mag = None
         else:
             self.mag_band = np.array(['NUV', 'r', 'i'])
-            self.mag = np.array([drpall[f'nsa_{self.phot_key}_absmag'][indx][1],
-                                 drpall[f'nsa_{self.phot_key}_absmag'][indx][4],
-                                 drpall[f'nsa_{self.phot_key}_absmag'][indx][5]])
+            absmag = row[f'nsa_{self.phot_key}_absmag']
+            self.mag = np.array([absmag[1], absmag[4], absmag[5]])
 
 
@@ -6,8 +6,6 @@ Provides a class to house and manipulate galaxy global parameters/metadata.
 """
 import warnings
 
-from IPython import embed
-
 import numpy as np
 
 import astropy.units
@@ -5,8 +5,6 @@ Provides a random set of utility methods.
 """
 import warnings
 
-from IPython import embed
-
 import numpy as np
 from scipy import sparse, stats, optimize
 from matplotlib import pyplot, patches
@@ -5,8 +5,6 @@ Provides a random set of utility methods.
 """
 import warnings
 
-from IPython import embed
-
 import numpy as np
 from scipy import sparse, linalg, stats, special, ndimage, spatial
 # Only used for debugging...
@@ -115,22 +113,33 @@ def get_map_bin_transformations(spatial_shape=None, binid=None):
         raise ValueError('Must provide spatial_shape or binid')
     _spatial_shape = spatial_shape if binid is None else binid.shape
 
-    nspax = np.prod(_spatial_shape)
+    nspax = int(np.prod(_spatial_shape))
     grid_indx = np.arange(nspax, dtype=int)
     if binid is None:
         # All bins are valid and considered unique
-        bin_transform = sparse.coo_matrix((np.ones(np.prod(spatial_shape), dtype=float),
-                                           (grid_indx,grid_indx)),
-                                          shape=(np.prod(spatial_shape),)*2).tocsr()
+        bin_transform = sparse.identity(nspax, dtype=float, format='csr')
         return None, np.ones(nspax, dtype=int), grid_indx.copy(), grid_indx, grid_indx.copy(), \
                 bin_transform
 
     # Get the indices of measurements with unique bin IDs, ignoring any
-    # IDs set to -1
+    # IDs set to -1.  This is equivalent to
+    #   np.unique(binid_map, return_index=True, return_inverse=True,
+    #             return_counts=True)
+    # but keeps the sorting vector so that it can be reused to construct the
+    # bin transform below.  The stable sort ensures that the first element of
+    # each group is the first occurrence of that bin ID and that the spaxels
+    # in each group are in ascending order.
     binid_map = binid.ravel()
-    ubinid, ubin_indx, bin_inverse, nbin \
-            = np.unique(binid_map, return_index=True, return_inverse=True, return_counts=True)
+    order = np.argsort(binid_map, kind='stable')
+    srt_binid = binid_map[order]
+    start = np.append(True, srt_binid[1:] != srt_binid[:-1])
+    ubin_indx = order[start]
+    ubinid = srt_binid[start]
+    nbin = np.diff(np.append(np.flatnonzero(start), nspax))
+    bin_inverse = np.empty(nspax, dtype=int)
+    bin_inverse[order] = np.cumsum(start) - 1
     if np.any(ubinid == -1):
+        order = order[nbin[0]:]
         ubinid = ubinid[1:]
         ubin_indx = ubin_indx[1:]
         grid_indx = grid_indx[bin_inverse > 0]
@@ -141,12 +150,12 @@ def get_map_bin_transformations(spatial_shape=None, binid=None):
     # exception is if the bin numbers are not sequential, i.e., the bin numbers
     # are not identical to np.arange(nbin).
 
-    # Construct the bin transform using a sparse matrix
-    d,i,j = np.array([[1/nbin[i],i,j] 
-                     for i,b in enumerate(ubinid)
-                     for j in np.where(binid_map == b)[0]]).T
-    bin_transform = sparse.coo_matrix((d,(i.astype(int),j.astype(int))),
-                                      shape=(ubinid.size, np.prod(_spatial_shape))).tocsr()
+    # Construct the bin transform using a sparse matrix.  Each valid spaxel
+    # contributes to exactly one bin (row), so the CSR arrays can be built
+    # directly from the grouped spaxel indices.
+    indptr = np.append(0, np.cumsum(nbin))
+    bin_transform = sparse.csr_matrix((np.repeat(1/nbin, nbin), order, indptr),
+                                      shape=(ubinid.size, nspax))
 
     return ubinid, nbin, ubin_indx, grid_indx, bin_inverse, bin_transform
 
@@ -4,6 +4,8 @@
 """
 
 import sys
+import math
+import warnings
 import argparse
 import multiprocessing as mp
 
@@ -34,6 +36,130 @@ from .data.util import trim_shape
 
 from .models.geometry import projected_polar
 
+#ConvolveFFTW instance used by bisym_model to speed up the beam smearing; set
+#by fit. It has to be a global because multiprocessing can't pickle cython.
+conv = None
+
+#last set of geometric terms computed by _bisym_geometry. It is kept here
+#rather than in the FitArgs object so that it is never pickled with it (e.g.,
+#in the output .gal file or when sending args to the dynesty pool).
+_bisym_geom_cache = None
+
+def _interp_weights(x, xp):
+    """
+    Construct the indices and weights for linearly interpolating any function
+    sampled at ``xp`` onto the coordinates ``x``.
+
+    This performs the search of :func:`numpy.interp` only once, such that
+    multiple functions sampled at the same ``xp`` can be interpolated as
+    ``fp[indx] + wgt * (fp[indx+1] - fp[indx])``. As with
+    :func:`numpy.interp`, coordinates outside the range of ``xp`` are given
+    the value at the nearest end point.
+
+    Args:
+        x (`numpy.ndarray`_):
+            Coordinates at which to interpolate.
+        xp (array-like):
+            Monotonically increasing coordinates of the function samples.
+
+    Returns:
+        :obj:`tuple`: Two `numpy.ndarray`_ objects with the shape of ``x``:
+        the index of the sample in ``xp`` just below each coordinate and the
+        linear weight of the sample just above it.
+    """
+    xp = np.asarray(xp, dtype=float)
+    indx = np.clip(np.searchsorted(xp, x, side='right') - 1, 0, xp.size - 2)
+    wgt = x - xp[indx]
+    wgt /= np.diff(xp)[indx]
+    return indx, np.clip(wgt, 0., 1., out=wgt)
+
+
+def _bisym_geometry(args, xc, yc, inc, pa, pab):
+    r"""
+    Construct the geometric terms of the bisymmetric velocity field.
+
+    The Spekkens & Sellwood (2007) model is
+
+    .. math::
+
+        V = V_{\rm sys} + \sin i \left[ V_t \cos\theta - V_{2,t}
+            \cos\theta \cos 2\theta_b - V_{2,r} \sin\theta \sin
+            2\theta_b \right],
+
+    with :math:`\theta_b = \theta - \phi_b`. This computes the
+    interpolation indices and weights for the radial profiles (see
+    :func:`_interp_weights`) and the three projection terms multiplying
+    :math:`V_t`, :math:`V_{2,t}`, and :math:`V_{2,r}`.
+
+    These depend only on the geometric parameters, so the result is cached
+    at the module level and reused as long as the coordinate grid, the bin
+    edges, and the geometric parameters are unchanged. The returned arrays must not be
+    modified.
+
+    Args:
+        args (:class:`~nirvana.data.fitargs.FitArgs`):
+            Object containing all of the data and settings needed for the
+            galaxy.
+        xc (:obj:`float`):
+            Center x coordinate.
+        yc (:obj:`float`):
+            Center y coordinate.
+        inc (:obj:`float`):
+            Inclination in radians.
+        pa (:obj:`float`):
+            First order position angle in radians.
+        pab (:obj:`float`):
+            Second order position angle in radians, relative to ``pa``.
+
+    Returns:
+        :obj:`tuple`: The interpolation indices and weights, followed by the
+        projection terms for the first order tangential, second order
+        tangential, and second order radial velocities. All are
+        `numpy.ndarray`_ objects with the shape of ``args.grid_x``.
+    """
+    global _bisym_geom_cache
+    key = (xc, yc, inc, pa, pab, tuple(args.edges))
+    cache = _bisym_geom_cache
+    if cache is not None and cache[0] is args.grid_x and cache[1] is args.grid_y \
+            and cache[2] == key:
+        return cache[3]
+
+    #masked pixels of a masked grid keep their unsquared data in projected_polar,
+    #which can give the sqrt negative values there; those pixels are never used
+    with np.errstate(invalid='ignore'):
+        r, th = projected_polar(args.grid_x-xc, args.grid_y-yc, pa, inc)
+    indx, wgt = _interp_weights(r, args.edges)
+
+    #only cos(th) and sin(th) are evaluated over the full grid; pab is a
+    #constant offset, so the 2 th_b terms follow from the double-angle and
+    #angle-addition identities:
+    #   cos(2 th_b) = cos(2 th) cos(2 pab) + sin(2 th) sin(2 pab)
+    #   sin(2 th_b) = sin(2 th) cos(2 pab) - cos(2 th) sin(2 pab)
+    costh = np.cos(th)
+    sinth = np.sin(th, out=th)
+    cos2th = np.square(costh)
+    cos2th -= np.square(sinth)
+    sin2th = np.multiply(costh, sinth)
+    sin2th *= 2
+    cos2pab, sin2pab = math.cos(2*pab), math.sin(2*pab)
+    v2tproj = cos2th * cos2pab
+    v2tproj += sin2th * sin2pab
+    v2rproj = np.multiply(sin2th, cos2pab, out=sin2th)
+    v2rproj -= np.multiply(cos2th, sin2pab, out=cos2th)
+
+    #include the projection factors
+    sini = math.sin(inc)
+    v2tproj *= costh
+    v2tproj *= sini
+    v2rproj *= sinth
+    v2rproj *= sini
+    vtproj = np.multiply(costh, sini, out=costh)
+
+    geom = (indx, wgt, vtproj, v2tproj, v2rproj)
+    _bisym_geom_cache = (args.grid_x, args.grid_y, key, geom)
+    return geom
+
+
 def bisym_model(args, paramdict, plot=False, relative_pab=False):
     '''
     Evaluate a bisymmetric velocity field model for given parameters.
@@ -66,38 +192,47 @@ def bisym_model(args, paramdict, plot=False, relative_pab=False):
     '''
 
     #convert angles to polar and normalize radial coorinate
-    inc, pa, pab = np.radians([paramdict['inc'], paramdict['pa'], paramdict['pab']])
+    inc, pa, pab = map(math.radians, (paramdict['inc'], paramdict['pa'], paramdict['pab']))
     if not relative_pab: pab = (pab - pa) % (2*np.pi)
-    r, th = projected_polar(args.grid_x-paramdict['xc'], args.grid_y-paramdict['yc'], pa, inc)
+    indx, wgt, vtproj, v2tproj, v2rproj \
+            = _bisym_geometry(args, paramdict['xc'], paramdict['yc'], inc, pa, pab)
 
     #interpolate the velocity arrays over full coordinates
     if len(args.edges) != len(paramdict['vt']):
         raise ValueError(f"Bin edge and velocity arrays are not the same shape: {len(args.edges)} and {len(paramdict['vt'])}")
-    vtvals  = np.interp(r, args.edges, paramdict['vt'])
-    v2tvals = np.interp(r, args.edges, paramdict['v2t'])
-    v2rvals = np.interp(r, args.edges, paramdict['v2r'])
-
-    #spekkens and sellwood 2nd order vf model (from andrew's thesis)
-    velmodel = paramdict['vsys'] + np.sin(inc) * (vtvals * np.cos(th) \
-             - v2tvals * np.cos(2 * (th - pab)) * np.cos(th) \
-             - v2rvals * np.sin(2 * (th - pab)) * np.sin(th))
-
+    #all profiles share the same radial samples, so only search for the
+    #interpolation indices once
+    def interp(fp):
+        return fp[indx] + wgt * (fp[indx+1] - fp[indx])
+    vtvals  = interp(np.asarray(paramdict['vt']))
+    v2tvals = interp(np.asarray(paramdict['v2t']))
+    v2rvals = interp(np.asarray(paramdict['v2r']))
+
+    #spekkens and sellwood 2nd order vf model (from andrew's thesis), built
+    #in place from the projection terms to avoid full-grid temporaries
+    velmodel = vtvals
+    velmodel *= vtproj
+    v2tvals *= v2tproj
+    velmodel -= v2tvals
+    v2rvals *= v2rproj
+    velmodel -= v2rvals
+    velmodel += paramdict['vsys']
 
     #define dispersion and surface brightness if desired
     if args.disp: 
-        sigmodel = np.interp(r, args.edges, paramdict['sig'])
+        sigmodel = interp(np.asarray(paramdict['sig']))
         sb = args.remap('sb', masked=False)
     else: 
         sigmodel = None
         sb = None
 
-    #apply beam smearing if beam is given
-    try: conv
-    except: conv = None
+    #apply beam smearing if beam is given, reusing the global FFTW plan if it
+    #matches the shape of the maps
     if args.beam_fft is not None:
+        cnvfftw = conv if conv is not None and conv.shape == args.beam_fft.shape else None
         if hasattr(args, 'smearing') and not args.smearing: pass
         else: sbmodel, velmodel, sigmodel = smear(velmodel, args.beam_fft, sb=sb, 
-                sig=sigmodel, beam_fft=True, cnvfftw=conv, verbose=False)
+                sig=sigmodel, beam_fft=True, cnvfftw=cnvfftw, verbose=False)
 
     #remasking after convolution
     if args.vel_mask is not None: velmodel = np.ma.array(velmodel, mask=args.remap('vel_mask'))
@@ -170,16 +305,14 @@ def unpack(params, args, jump=None, bound=False, relative_pab=False):
     start = args.nglobs
     if jump is None: jump = len(args.edges) - args.fixcent
 
-    #velocities
-    paramdict['vt']  = params[start:start + jump]
-    paramdict['v2t'] = params[start + jump:start + 2*jump]
-    paramdict['v2r'] = params[start + 2*jump:start + 3*jump]
+    #velocities as views of a single (3, jump) block
+    vels = np.asarray(params[start:start + 3*jump])
+    vels = vels.reshape(3, jump, *vels.shape[1:])
 
-    #add in 0 center bin
+    #add in 0 center bin for all three components with one allocation
     if args.fixcent and not bound:
-        paramdict['vt']  = np.insert(paramdict['vt'],  0, 0)
-        paramdict['v2t'] = np.insert(paramdict['v2t'], 0, 0)
-        paramdict['v2r'] = np.insert(paramdict['v2r'], 0, 0)
+        vels = np.concatenate([np.zeros((3,1)), vels], axis=1)
+    paramdict['vt'], paramdict['v2t'], paramdict['v2r'] = vels
 
     #get sigma values and fill in center bin if necessary
     if args.disp: 
@@ -576,7 +709,12 @@ def fit(plate, ifu, galmeta = None, daptype='HYB10-MILESHC-MASTARHC2', dr='MPL-1
     #define a variable for speeding up convolutions
     #has to be a global because multiprocessing can't pickle cython
     global conv
-    conv = ConvolveFFTW(args.spatial_shape)
+    try:
+        conv = ConvolveFFTW(args.spatial_shape)
+    except:
+        warnings.warn('Could not instantiate ConvolveFFTW; proceeding with numpy '
+                      'FFT/convolution routines.')
+        conv = None
 
     #starting positions for all parameters based on a quick fit
     #not used in dynesty
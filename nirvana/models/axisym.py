@@ -6,12 +6,11 @@ Module with classes and functions used to fit an axisymmetric disk to a set of k
 """
 
 import os
+import math
 import warnings
 
-from IPython import embed
-
 import numpy as np
-from scipy import optimize
+from scipy import optimize, linalg, sparse
 from matplotlib import pyplot, rc, patches, ticker, colors
 
 from astropy.io import fits
@@ -21,7 +20,7 @@ from .geometry import projected_polar, deriv_projected_polar
 from .beam import ConvolveFFTW, smear, deriv_smear
 from .util import cov_err
 from ..data.scatter import IntrinsicScatter
-from ..data.util import impose_positive_definite, cinv, inverse, find_largest_coherent_region
+from ..data.util import impose_positive_definite, inverse, find_largest_coherent_region
 from ..data.util import select_major_axis, bin_stats, growth_lim, atleast_one_decade
 from ..util.bitmask import BitMask
 from ..util import plot
@@ -403,7 +402,10 @@ class AxisymmetricDisk:
         self.par = self.guess_par()
         self.x = None
         self.y = None
+        self._polar_cache = None
+        self._covar_cache = None
         self.beam_fft = None
+        self._beam_src = None
         self.kin = None
         self.sb = None
         self.vel_gpm = None
@@ -559,12 +561,38 @@ class AxisymmetricDisk:
         """
         if par.ndim != 1:
             raise ValueError('Parameter array must be a 1D vector.')
+        # NOTE: The parameters are copied into the existing vector instead of
+        # allocating a new one for every model evaluation.  The vector is
+        # owned by this object; see _init_par.
         if par.size == self.np:
-            self.par = par.copy()
+            self.par[:] = par
             return
         if par.size != self.nfree:
             raise ValueError('Must provide {0} or {1} parameters.'.format(self.np, self.nfree))
-        self.par[self.free] = par.copy()
+        self.par[self.free] = par
+
+    def _disk_polar(self):
+        """
+        Return the in-plane radius and the cosine of the in-plane azimuth at
+        the model coordinates, given the current geometric parameters.
+
+        The result is cached and only recomputed if the coordinate arrays or
+        the geometric parameters (center, position angle, and inclination)
+        change.  This avoids recalculating the projection, e.g., when only the
+        rotation-curve or dispersion parameters are perturbed.
+
+        Returns:
+            :obj:`tuple`: Two `numpy.ndarray`_ objects with the radius and the
+            cosine of the azimuth.  These are the cached arrays and must not be
+            altered.
+        """
+        geom = tuple(self.par[:4])
+        if self._polar_cache is None or self._polar_cache[0] is not self.x \
+                or self._polar_cache[1] is not self.y or self._polar_cache[2] != geom:
+            r, theta = projected_polar(self.x - self.par[0], self.y - self.par[1],
+                                       math.radians(self.par[2]), math.radians(self.par[3]))
+            self._polar_cache = (self.x, self.y, geom, r, np.cos(theta, out=theta))
+        return self._polar_cache[3:]
 
     def _init_coo(self, x, y):
         """
@@ -664,8 +692,16 @@ class AxisymmetricDisk:
         if self.x.ndim != 2:
             raise ValueError('To perform convolution, must provide 2d coordinate arrays.')
 
-        # Assign the beam and check it
-        self.beam_fft = beam if is_fft else np.fft.fftn(np.fft.ifftshift(beam))
+        # Assign the beam and check it.  If the provided beam image is the same
+        # object used to construct the current :attr:`beam_fft`, skip
+        # recomputing its FFT.  NOTE: This means that changes made to a
+        # beam image *in place* are not detected; pass a new array instead.
+        if is_fft:
+            self.beam_fft = beam
+            self._beam_src = None
+        elif beam is not self._beam_src or self.beam_fft is None:
+            self.beam_fft = np.fft.fftn(np.fft.ifftshift(beam))
+            self._beam_src = beam
         if self.beam_fft.shape != self.x.shape:
             raise ValueError('Currently, convolution requires the beam map to have the same '
                                 'shape as the coordinate maps.')
@@ -710,9 +746,9 @@ class AxisymmetricDisk:
         _p0 = np.atleast_1d(p0)
         if _p0.size != self.np:
             raise ValueError('Incorrect number of model parameters.')
-        self.par = _p0
+        self.par = _p0.astype(float)
         self.par_err = None
-        _free = np.ones(self.np, dtype=bool) if fix is None else np.logical_not(fix)
+        _free = np.ones(self.np, dtype=bool) if fix is None else ~np.asarray(fix, dtype=bool)
         if _free.size != self.np:
             raise ValueError('Incorrect number of model parameter fitting flags.')
         self.free = _free
@@ -794,15 +830,17 @@ class AxisymmetricDisk:
         if par is not None:
             self._set_par(par)
 
-        r, theta = projected_polar(self.x - self.par[0], self.y - self.par[1],
-                                   *np.radians(self.par[2:4]))
+        r, cos_theta = self._disk_polar()
 
         # NOTE: The velocity-field construction does not include the
         # sin(inclination) term because this is absorbed into the
-        # rotation curve amplitude.
+        # rotation curve amplitude.  The projection and systemic offset are
+        # applied in place to avoid allocating temporary arrays.
         ps = self.nbp
         pe = ps + self.rc.np
-        vel = self.rc.sample(r, par=self.par[ps:pe])*np.cos(theta) + self.par[4]
+        vel = self.rc.sample(r, par=self.par[ps:pe])
+        vel *= cos_theta
+        vel += self.par[4]
         if self.dc is None:
             # Only fitting the velocity field
             return vel if self.beam_fft is None or ignore_beam \
@@ -905,7 +943,8 @@ class AxisymmetricDisk:
         dinc[3] = np.radians(1.)
 
         r, theta, dr, dtheta = deriv_projected_polar(self.x - self.par[0], self.y - self.par[1],
-                                                     *np.radians(self.par[2:4]), dxdp=dx, dydp=dy,
+                                                     math.radians(self.par[2]),
+                                                     math.radians(self.par[3]), dxdp=dx, dydp=dy,
                                                      dpadp=dpa, dincdp=dinc)
 
         # NOTE: The velocity-field construction does not include the
@@ -958,30 +997,34 @@ class AxisymmetricDisk:
         return v, sig, dv, dsig
 
     def _v_resid(self, vel):
-        return self.kin.vel[self.vel_gpm] - vel[self.vel_gpm]
+        return self._v_data - vel[self._vel_indx]
     def _deriv_v_resid(self, dvel):
-        return -dvel[np.ix_(self.vel_gpm, self.free)]
+        return -dvel[np.ix_(self._vel_indx, self.free)]
     def _v_chisqr(self, vel):
-        return self._v_resid(vel) / self._v_err[self.vel_gpm]
+        return self._v_resid(vel) * self._v_wgt
     def _deriv_v_chisqr(self, dvel):
-        return self._deriv_v_resid(dvel) / self._v_err[self.vel_gpm, None]
+        return self._deriv_v_resid(dvel) * self._v_wgt[:,None]
     def _v_chisqr_covar(self, vel):
-        return np.dot(self._v_resid(vel), self._v_ucov)
+        return linalg.solve_triangular(self._v_chol, self._v_resid(vel), lower=True,
+                                       check_finite=False)
     def _deriv_v_chisqr_covar(self, dvel):
-        return np.dot(self._deriv_v_resid(dvel).T, self._v_ucov).T
+        return linalg.solve_triangular(self._v_chol, self._deriv_v_resid(dvel), lower=True,
+                                       check_finite=False)
 
     def _s_resid(self, sig):
-        return self.kin.sig_phys2[self.sig_gpm] - sig[self.sig_gpm]**2
+        return self._s_data - sig[self._sig_indx]**2
     def _deriv_s_resid(self, sig, dsig):
-        return -2 * sig[self.sig_gpm,None] * dsig[np.ix_(self.sig_gpm, self.free)]
+        return -2 * sig[self._sig_indx,None] * dsig[np.ix_(self._sig_indx, self.free)]
     def _s_chisqr(self, sig):
-        return self._s_resid(sig) / self._s_err[self.sig_gpm]
+        return self._s_resid(sig) * self._s_wgt
     def _deriv_s_chisqr(self, sig, dsig):
-        return self._deriv_s_resid(sig, dsig) / self._s_err[self.sig_gpm, None]
+        return self._deriv_s_resid(sig, dsig) * self._s_wgt[:,None]
     def _s_chisqr_covar(self, sig):
-        return np.dot(self._s_resid(sig), self._s_ucov)
+        return linalg.solve_triangular(self._s_chol, self._s_resid(sig), lower=True,
+                                       check_finite=False)
     def _deriv_s_chisqr_covar(self, sig, dsig):
-        return np.dot(self._deriv_s_resid(sig, dsig).T, self._s_ucov).T
+        return linalg.solve_triangular(self._s_chol, self._deriv_s_resid(sig, dsig), lower=True,
+                                       check_finite=False)
 
     def _resid(self, par, sep=False):
         """
@@ -1003,10 +1046,14 @@ class AxisymmetricDisk:
             dispersion data (based on ``sep``).
         """
         self._set_par(par)
-        vel, sig = (self.kin.bin(self.model()), None) if self.dc is None \
-                        else map(lambda x : self.kin.bin(x), self.model())
+        if self.dc is None:
+            # Only fitting the velocity field, so there's no need to append
+            # the (empty) dispersion residuals
+            vfom = self._v_resid(self.kin.bin(self.model()))
+            return (vfom, np.array([])) if sep else vfom
+        vel, sig = map(lambda x : self.kin.bin(x), self.model())
         vfom = self._v_resid(vel)
-        sfom = numpy.array([]) if self.dc is None else self._s_resid(sig)
+        sfom = self._s_resid(sig)
         return (vfom, sfom) if sep else np.append(vfom, sfom)
 
     def _deriv_resid(self, par, sep=False):
@@ -1032,13 +1079,13 @@ class AxisymmetricDisk:
         self._set_par(par)
         if self.dc is None:
             vel, dvel = self.kin.deriv_bin(*self.deriv_model())
-            return (self._deriv_v_resid(dvel), numpy.array([])) \
+            return (self._deriv_v_resid(dvel), np.array([])) \
                         if sep else self._deriv_v_resid(dvel)
 
         vel, sig, dvel, dsig = self.deriv_model()
         vel, dvel = self.kin.deriv_bin(vel, dvel)
         sig, dsig = self.kin.deriv_bin(sig, dsig)
-        resid = (self._deriv_v_resid(vel), self._deriv_s_resid(sig, dsig))
+        resid = (self._deriv_v_resid(dvel), self._deriv_s_resid(sig, dsig))
         return resid if sep else np.vstack(resid)
 
     def _chisqr(self, par, sep=False):
@@ -1062,14 +1109,16 @@ class AxisymmetricDisk:
             the velocity and velocity dispersion data (based on ``sep``).
         """
         self._set_par(par)
-        vel, sig = (self.kin.bin(self.model()), None) if self.dc is None \
-                        else map(lambda x : self.kin.bin(x), self.model())
-        if self.has_covar:
-            vfom = self._v_chisqr_covar(vel)
-            sfom = np.array([]) if self.dc is None else self._s_chisqr_covar(sig)
-        else:
-            vfom = self._v_chisqr(vel)
-            sfom = np.array([]) if self.dc is None else self._s_chisqr(sig)
+        vf = self._v_chisqr_covar if self.has_covar else self._v_chisqr
+        if self.dc is None:
+            # Only fitting the velocity field, so there's no need to append
+            # the (empty) dispersion residuals
+            vfom = vf(self.kin.bin(self.model()))
+            return (vfom, np.array([])) if sep else vfom
+        sf = self._s_chisqr_covar if self.has_covar else self._s_chisqr
+        vel, sig = map(lambda x : self.kin.bin(x), self.model())
+        vfom = vf(vel)
+        sfom = sf(sig)
         return (vfom, sfom) if sep else np.append(vfom, sfom)
 
     def _deriv_chisqr(self, par, sep=False):
@@ -1097,7 +1146,7 @@ class AxisymmetricDisk:
         vf = self._deriv_v_chisqr_covar if self.has_covar else self._deriv_v_chisqr
         if self.dc is None:
             vel, dvel = self.kin.deriv_bin(*self.deriv_model())
-            return (vf(dvel), numpy.array([])) if sep else vf(dvel)
+            return (vf(dvel), np.array([])) if sep else vf(dvel)
 
         sf = self._deriv_s_chisqr_covar if self.has_covar else self._deriv_s_chisqr
         vel, sig, dvel, dsig = self.deriv_model()
@@ -1163,15 +1212,21 @@ class AxisymmetricDisk:
         self.kin = kin
         self._init_coo(self.kin.grid_x, self.kin.grid_y)
         self._init_sb(self.kin.grid_sb if sb_wgt else None)
-        self.vel_gpm = np.logical_not(self.kin.vel_mask)
-        self.sig_gpm = None if self.dc is None else np.logical_not(self.kin.sig_mask)
+        self.vel_gpm = ~self.kin.vel_mask
+        self.sig_gpm = None if self.dc is None else ~self.kin.sig_mask
+        # Use the indices of the good measurements (and the selected data,
+        # which don't change during the fit) when calculating the residuals
+        self._vel_indx = np.flatnonzero(self.vel_gpm)
+        self._v_data = self.kin.vel[self._vel_indx]
+        self._sig_indx = None if self.dc is None else np.flatnonzero(self.sig_gpm)
+        self._s_data = None if self.dc is None else self.kin.sig_phys2[self._sig_indx]
         # Initialize the beam kernel
         self._init_beam(self.kin.beam_fft, True, cnvfftw)
 
         # Determine which errors were provided
         self.has_err = self.kin.vel_ivar is not None if self.dc is None \
                         else self.kin.vel_ivar is not None and self.kin.sig_ivar is not None
-        if not self.has_err and (self.kin.vel_err is not None or self.kin.sig_err is not None):
+        if not self.has_err and (self.kin.vel_ivar is not None or self.kin.sig_ivar is not None):
             warnings.warn('Some errors being ignored if both velocity and velocity dispersion '
                           'errors are not provided.')
         self.has_covar = self.kin.vel_covar is not None if self.dc is None \
@@ -1214,36 +1269,80 @@ class AxisymmetricDisk:
         else:
             self._v_err = None
             self._s_err = None
+        # Set the (inverse-error) weights for the fitted measurements so that
+        # they don't need to be selected and inverted for every evaluation of
+        # the figure-of-merit.
+        self._v_wgt = None if self._v_err is None else 1/self._v_err[self._vel_indx]
+        self._s_wgt = None if self._s_err is None else 1/self._s_err[self._sig_indx]
 
         # Set the internal covariance attributes
         if self.has_covar:
-            # Construct the matrices used to calculate the merit function in
-            # the presence of covariance.
-            vel_pd_covar = self.kin.vel_covar[np.ix_(self.vel_gpm,self.vel_gpm)]
-            sig_pd_covar = None if self.dc is None \
-                            else self.kin.sig_phys2_covar[np.ix_(self.sig_gpm,self.sig_gpm)]
-            if not assume_posdef_covar:
-                # Force the matrices to be positive definite
-                print('Forcing vel covar to be pos-def')
-                vel_pd_covar = impose_positive_definite(vel_pd_covar)
-                print('Forcing sig covar to be pos-def')
-                sig_pd_covar = None if self.dc is None else impose_positive_definite(sig_pd_covar)
-
-            if self.scatter is not None:
-                # A diagonal matrix with only positive values is, by definition,
-                # positive definite; and the sum of two positive-definite
-                # matrices is also positive definite.
-                vel_pd_covar += np.diag(np.full(vel_pd_covar.shape[0], self.scatter[0]**2,
-                                                dtype=float))
-                if self.dc is not None:
-                    sig_pd_covar += np.diag(np.full(sig_pd_covar.shape[0], self.scatter[1]**2,
+            # The positive-definite corrections and Cholesky factors only
+            # depend on the covariance matrices, the selected measurements,
+            # and the intrinsic scatter.  Reuse them if these haven't changed
+            # since the last fit (e.g., during iterative rejection without
+            # any newly rejected measurements).
+            sig_covar = None if self.dc is None else self.kin.sig_phys2_covar
+            covar_key = (self.vel_gpm.tobytes(),
+                         None if self.dc is None else self.sig_gpm.tobytes(),
+                         assume_posdef_covar,
+                         None if self.scatter is None else tuple(self.scatter))
+            if self._covar_cache is not None and self._covar_cache[0] is self.kin.vel_covar \
+                    and self._covar_cache[1] is sig_covar and self._covar_cache[2] == covar_key:
+                self._v_chol, self._s_chol = self._covar_cache[3]
+            else:
+                # Construct the matrices used to calculate the merit function in
+                # the presence of covariance.
+                vel_pd_covar = self.kin.vel_covar[np.ix_(self.vel_gpm,self.vel_gpm)]
+                sig_pd_covar = None if self.dc is None \
+                                else self.kin.sig_phys2_covar[np.ix_(self.sig_gpm,self.sig_gpm)]
+                if not assume_posdef_covar:
+                    # Force the matrices to be positive definite
+                    print('Forcing vel covar to be pos-def')
+                    vel_pd_covar = impose_positive_definite(vel_pd_covar)
+                    print('Forcing sig covar to be pos-def')
+                    sig_pd_covar = None if self.dc is None \
+                                        else impose_positive_definite(sig_pd_covar)
+
+                if self.scatter is not None:
+                    # A diagonal matrix with only positive values is, by definition,
+                    # positive definite; and the sum of two positive-definite
+                    # matrices is also positive definite.
+                    vel_pd_covar += np.diag(np.full(vel_pd_covar.shape[0], self.scatter[0]**2,
                                                     dtype=float))
-
-            self._v_ucov = cinv(vel_pd_covar, upper=True)
-            self._s_ucov = None if sig_pd_covar is None else cinv(sig_pd_covar, upper=True)
+                    if self.dc is not None:
+                        sig_pd_covar += np.diag(np.full(sig_pd_covar.shape[0],
+                                                        self.scatter[1]**2, dtype=float))
+
+                # NOTE: Instead of explicitly inverting the covariance matrices,
+                # keep their lower-triangular Cholesky factors, C = L L^T.  The
+                # residuals are then whitened by solving L x = r, which only
+                # touches the lower triangle and, with finite checks turned off,
+                # is faster than the product with the inverted factor.
+                self._v_chol = self._cholesky(vel_pd_covar)
+                self._s_chol = None if sig_pd_covar is None else self._cholesky(sig_pd_covar)
+                self._covar_cache = (self.kin.vel_covar, sig_covar, covar_key,
+                                     (self._v_chol, self._s_chol))
         else:
-            self._v_ucov = None
-            self._s_ucov = None
+            self._v_chol = None
+            self._s_chol = None
+
+    @staticmethod
+    def _cholesky(covar):
+        """
+        Return the lower-triangular Cholesky factor of a covariance matrix.
+
+        Args:
+            covar (`numpy.ndarray`_, `scipy.sparse.csr_matrix`_):
+                Positive-definite covariance matrix.
+
+        Returns:
+            `numpy.ndarray`_: Lower-triangular matrix, :math:`L`, such that
+            :math:`C = L L^T`, in Fortran order for use with
+            `scipy.linalg.solve_triangular`_.
+        """
+        _covar = covar.toarray() if sparse.issparse(covar) else np.asarray(covar)
+        return np.asfortranarray(linalg.cholesky(_covar, lower=True, check_finite=False))
 
     def _get_fom(self):
         """
@@ -1440,6 +1539,13 @@ class AxisymmetricDisk:
         parn = self.par_names()
         max_parn_len = max([len(n) for n in parn])+4
 
+        def par_lines(ps, pe):
+            # Build the lines for a set of parameters so that they're printed
+            # all at once
+            return '\n'.join([f'{parn[i]:>{max_parn_len}}: {self.par[i]:.1f}'
+                              + ('' if self.par_err is None else f' +/- {self.par_err[i]:.1f}')
+                              for i in range(ps,pe)])
+
         print('-'*70)
         print(f'{"Fit Result":^70}')
         print('-'*70)
@@ -1452,16 +1558,12 @@ class AxisymmetricDisk:
         ps = 0
         pe = self.nbp
         print(f'Base parameters:')
-        for i in range(ps,pe):
-            print(('{0:>'+f'{max_parn_len}'+'}'+ f': {self.par[i]:.1f}').format(parn[i])
-                    + (f'' if self.par_err is None else f' +/- {self.par_err[i]:.1f}'))
+        print(par_lines(ps, pe))
         print('-'*10)
         ps = self.nbp
         pe = ps + self.rc.np
         print(f'Rotation curve parameters:')
-        for i in range(ps,pe):
-            print(('{0:>'+f'{max_parn_len}'+'}'+ f': {self.par[i]:.1f}').format(parn[i])
-                    + (f'' if self.par_err is None else f' +/- {self.par_err[i]:.1f}'))
+        print(par_lines(ps, pe))
         if self.dc is None:
             print('-'*10)
             if self.scatter is not None:
@@ -1476,9 +1578,7 @@ class AxisymmetricDisk:
         ps = self.nbp+self.rc.np
         pe = ps + self.dc.np
         print(f'Dispersion profile parameters:')
-        for i in range(ps,pe):
-            print(('{0:>'+f'{max_parn_len}'+'}'+ f': {self.par[i]:.1f}').format(parn[i])
-                    + (f'' if self.par_err is None else f' +/- {self.par_err[i]:.1f}'))
+        print(par_lines(ps, pe))
         print('-'*10)
         if self.scatter is not None:
             print(f'Intrinsic Velocity Scatter: {self.scatter[0]:.1f}')
@@ -1870,7 +1970,7 @@ def axisym_fit_plot(galmeta, kin, disk, par=None, par_err=None, fix=None, ofile=
     if _fix.size != disk.np:
         raise ValueError('Number of provided parameter fixing flags has the incorrect size.')
 
-    disk.par = _par
+    disk.par = np.array(_par, dtype=float)
     disk.par_err = _par_err
 
     # Get the fit statistics
@@ -4,8 +4,6 @@ Methods for geometric projection.
 .. include:: ../include/links.rst
 """
 
-from IPython import embed
-
 import numpy as np
 from scipy.spatial import KDTree
 
@@ -5,8 +5,6 @@ Implements one-dimensional functions for modeling.
 """
 import warnings
 
-from IPython import embed
-
 import numpy as np
 from scipy import special
 
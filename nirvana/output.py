@@ -153,7 +153,9 @@ def imagefits(f, galmeta=None, gal=None, outfile=None, padding=20, remotedir=Non
     '''
 
     if gal==True: 
-        try: gal = pickle.load(open(f[:-4] + 'gal', 'rb'))
+        try:
+            with open(f[:-4] + 'gal', 'rb') as fh:
+                gal = pickle.load(fh)
         except: raise FileNotFoundError('Could not load .gal file')
 
     #get relevant data
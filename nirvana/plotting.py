@@ -15,10 +15,8 @@ import multiprocessing as mp
 from functools import partial
 
 import dynesty
-import corner
 import pickle
 from glob import glob
-from tqdm import tqdm
 from astropy.io import fits
 
 from .fitting import bisym_model, unpack
@@ -28,6 +26,26 @@ from .models.beam import smear, ConvolveFFTW
 from .models.geometry import projected_polar
 
 
+def _as_results(samp):
+    """
+    Get the results of a `dynesty`_ fit from any of the formats accepted by
+    the plotting functions.
+
+    Args:
+        samp (:obj:`str`, `dynesty.NestedSampler`_, `dynesty.results.Results`_, `numpy.ndarray`_):
+            Sampler, results, or file of dumped results from `dynesty`_ fit.
+            Results and arrays are returned as is.
+
+    Returns:
+        `dynesty.results.Results`_: Results of the fit.
+    """
+    if isinstance(samp, str):
+        with open(samp, 'rb') as fh:
+            return pickle.load(fh)
+    if isinstance(samp, (dynesty.results.Results, np.ndarray)):
+        return samp
+    return samp.results
+
 def dynmeds(samp, stds=False, fixcent=True):
     """
     Get median values for each variable's posterior in a
@@ -49,29 +67,45 @@ def dynmeds(samp, stds=False, fixcent=True):
     """
 
     #get samples and weights
-    if type(samp) == str: res = pickle.load(open(samp,'rb'))
-    elif type(samp)==dynesty.results.Results: res = samp
-    else: res = samp.results
+    res = _as_results(samp)
     samps = res.samples
     weights = np.exp(res.logwt - res.logz[-1])
 
-    #iterate through and get 50th percentile of values
-    meds = np.zeros(samps.shape[1])
-    for i in range(samps.shape[1]):
-        meds[i] = dynesty.utils.quantile(samps[:,i],[.5],weights)[0]
+    #get the 50th percentile and, if desired, the 1 sigma values on either
+    #side of the median all at once
+    if not stds: return weighted_quantiles(samps, weights, [.5])[0]
+    meds, lstd, ustd = weighted_quantiles(samps, weights, [.5, .5-.6826/2, .5+.6826/2])
+    return meds, lstd, ustd
 
-    #pull out 1 sigma values on either side of the mean as well if desired
-    if stds:
-        lstd = np.zeros(samps.shape[1])
-        ustd = np.zeros(samps.shape[1])
-        for i in range(samps.shape[1]):
-            lstd[i] = dynesty.utils.quantile(samps[:,i], [.5-.6826/2], weights)[0]
-            ustd[i] = dynesty.utils.quantile(samps[:,i], [.5+.6826/2], weights)[0]
-        return meds, lstd, ustd
+def weighted_quantiles(samps, weights, qs):
+    r"""
+    Compute weighted quantiles for every column of a set of samples.
+
+    This follows the same algorithm as `dynesty.utils.quantile` but sorts each
+    column only once for all of the requested quantiles.
 
-    return meds
+    Args:
+        samps (`numpy.ndarray`_):
+            Array of samples with shape :math:`(N_{\rm samp}, N_{\rm par})`.
+        weights (`numpy.ndarray`_):
+            Weights for each sample. Shape must be :math:`(N_{\rm samp},)`.
+        qs (array-like):
+            Quantiles to compute. Must be between 0 and 1.
+
+    Returns:
+        `numpy.ndarray`_: Array with shape :math:`(N_q, N_{\rm par})` with
+        the quantiles for each column of ``samps``.
+    """
+    qs = np.atleast_1d(qs)
+    out = np.empty((len(qs), samps.shape[1]), dtype=float)
+    for i in range(samps.shape[1]):
+        order = np.argsort(samps[:,i])
+        cdf = np.cumsum(weights[order])[:-1]
+        cdf = np.append(0, cdf/cdf[-1])
+        out[:,i] = np.interp(qs, cdf, samps[order,i])
+    return out
 
-def profs(samp, args, plot=None, stds=False, jump=None, **kwargs):
+def profs(samp, args, plot=None, stds=False, jump=None, meds=None, **kwargs):
     '''
     Turn a sampler output by `nirvana` into a set of rotation curves.
     
@@ -90,6 +124,10 @@ def profs(samp, args, plot=None, stds=False, jump=None, **kwargs):
         jump (:obj:`int`, optional):
             Number of radial bins in the sampler. Will be calculated
             automatically if not specified.
+        meds (`numpy.ndarray`_, :obj:`tuple`, optional):
+            Precomputed output of :func:`dynmeds` for ``samp`` (using the same
+            value of ``stds``). If provided, ``samp`` is not used and the
+            posterior quantiles are not recalculated.
         **kwargs:
             args for :func:`plt.plot`.
 
@@ -112,7 +150,7 @@ def profs(samp, args, plot=None, stds=False, jump=None, **kwargs):
     '''
 
     #get and unpack median values for params
-    meds = dynmeds(samp, stds=stds, fixcent=args.fixcent)
+    if meds is None: meds = dynmeds(samp, stds=stds, fixcent=args.fixcent)
 
     #get standard deviations and put them into the dictionary
     if stds:
@@ -126,12 +164,15 @@ def profs(samp, args, plot=None, stds=False, jump=None, **kwargs):
 
         start = args.nglobs
         jump = len(args.edges) - args.fixcent
-        vs = ['vt', 'v2t', 'v2r']
-        for i,v in enumerate(vs):
-            for b in ['l','u']:
-                exec(f'paramdict["{v}{b}"] = {b}std[start + {i}*jump : start + {i+1}*jump]')
-                if args.fixcent:
-                    exec(f'paramdict["{v}{b}"] = np.insert(paramdict["{v}{b}"], 0, 0)')
+
+        #lower and upper bounds for all three velocity components at once,
+        #adding in the 0 center bin with a single allocation if necessary
+        bounds = np.stack([lstd[start:start + 3*jump], ustd[start:start + 3*jump]])
+        bounds = bounds.reshape(2, 3, jump)
+        if args.fixcent:
+            bounds = np.concatenate([np.zeros((2, 3, 1)), bounds], axis=2)
+        for i,v in enumerate(['vt', 'v2t', 'v2r']):
+            paramdict[f'{v}l'], paramdict[f'{v}u'] = bounds[:,i]
 
         #dispersion stds
         if args.disp: 
@@ -152,7 +193,7 @@ def profs(samp, args, plot=None, stds=False, jump=None, **kwargs):
         if stds: 
             errors = [[paramdict['vtl'], paramdict['vtu']], [paramdict['v2tl'], paramdict['v2tu']], [paramdict['v2rl'], paramdict['v2ru']]]
             for i,p in enumerate(errors):
-                plot.fill_between(args.edges, p[0], p[1], alpha=.5) 
+                plot.fill_between(args.edges, p[0], p[1], alpha=.5, rasterized=True) 
 
         plt.xlabel(r'$R_e$')
         plt.ylabel(r'$v$ (km/s)')
@@ -212,7 +253,7 @@ def fileprep(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None,
             of the fit.
     """
     #unpack fits file
-    if type(f) == str and '.fits' in f:
+    if isinstance(f, str) and '.fits' in f:
         isfits = True #tracker variable
 
         #open file and get relevant stuff from header
@@ -248,13 +289,11 @@ def fileprep(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None,
         isfits = False
 
         #get sampler in right format
-        if type(f) == str: chains = pickle.load(open(f,'rb'))
-        elif type(f) == np.ndarray: chains = f
-        elif type(f) == dynesty.nestedsamplers.MultiEllipsoidSampler: chains = f.results
+        chains = _as_results(f)
 
         if gal is None and '.nirv' in f and os.path.isfile(f[:-5] + '.gal'):
             gal = f[:-5] + '.gal'
-        if type(gal) == str: gal = np.load(gal, allow_pickle=True)
+        if isinstance(gal, str): gal = np.load(gal, allow_pickle=True)
 
         #parse the automatically generated filename
         if plate is None or ifu is None:
@@ -304,10 +343,10 @@ def fileprep(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None,
     if gal is not None: clip = False
     if clip: args.clip()
 
-    vel_r = args.remap('vel')
-    sig_r = args.remap('sig') if args.sig_phys2 is None else np.sqrt(np.abs(args.remap('sig_phys2')))
-
-    if not isfits: meds = dynmeds(chains)
+    #get the posterior quantiles once and reuse them for the profiles below
+    if not isfits:
+        quants = dynmeds(chains, stds=True)
+        meds = quants[0]
 
     #get appropriate number of edges  by looking at length of meds
     nbins = (len(meds) - args.nglobs - fixcent)/4
@@ -319,7 +358,7 @@ def fileprep(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None,
     #calculate edges and velocity profiles, get basic data
     if not isfits:
         if gal is None: args.setedges(nbins - 1 + args.fixcent, nbin=True, maxr=maxr)
-        resdict = profs(chains, args, stds=True)
+        resdict = profs(chains, args, stds=True, meds=quants)
         resdict['plate'] = plate
         resdict['ifu'] = ifu
         resdict['type'] = 'Stars' if stellar else 'Gas'
@@ -333,7 +372,8 @@ def fileprep(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None,
     return args, resdict
 
 def summaryplot(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None, cen=True,
-                fixcent=True, save=False, clobber=False, remotedir=None, gal=None, relative_pab=False):
+                fixcent=True, save=False, clobber=False, remotedir=None, gal=None, relative_pab=False,
+                dpi=200):
     """
     Make a summary plot for a `nirvana` output file with MaNGA velocity
     field.
@@ -378,6 +418,9 @@ def summaryplot(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None
         remotedir (:obj:`str`, optional):
             Directory to load MaNGA data files from, or save them if they are
             not found and are remotely downloaded.
+        dpi (:obj:`int`, optional):
+            Resolution used for the rasterized image panels when the plot is
+            saved. Only matters if `save=True`.
     """
 
     #check if plot file already exists
@@ -398,137 +441,84 @@ def summaryplot(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None
     if args.vel_ivar is None: args.vel_ivar = np.ones_like(args.vel)
     if args.sig_ivar is None: args.sig_ivar = np.ones_like(args.sig)
 
+    #residuals and chisq from the fits
+    velresid = vel_r - velmodel
+    velchisq = velresid**2 * args.remap('vel_ivar')
+    sigresid = sig_r - sigmodel
+    sigchisq = sigresid**2 * args.remap('sig_ivar')
+
+    #make all of the panels on a single figure
+    fig, axes = plt.subplots(3, 4, figsize=(12,9))
+    ax = axes.ravel()
+
     #print global parameters on figure
-    fig = plt.figure(figsize = (12,9))
-    plt.subplot(3,4,1)
-    ax = plt.gca()
-    infobox(ax, resdict, args, cen, relative_pab)
+    infobox(ax[0], resdict, args, cen, relative_pab, velmodel=velmodel, sigmodel=sigmodel,
+            vel_r=vel_r, sig_r=sig_r, velchisq=velchisq, sigchisq=sigchisq)
 
     #image
-    plt.subplot(3,4,2)
-    if args.image is not None: plt.imshow(args.image)
-    else: plt.text(.5,.5, 'No image found', horizontalalignment='center',
-            transform=plt.gca().transAxes, size=14)
+    if args.image is not None: ax[1].imshow(args.image, rasterized=True)
+    else: ax[1].text(.5,.5, 'No image found', horizontalalignment='center',
+            transform=ax[1].transAxes, size=14)
 
-    plt.axis('off')
+    ax[1].axis('off')
 
     #Radial velocity profiles
-    plt.subplot(3,4,3)
     ls = [r'$V_t$',r'$V_{2t}$',r'$V_{2r}$']
     for i,v in enumerate(['vt', 'v2t', 'v2r']):
-        plt.plot(args.edges, resdict[v], label=ls[i]) 
+        ax[2].plot(args.edges, resdict[v], label=ls[i]) 
 
     errors = [[resdict['vtl'], resdict['vtu']], [resdict['v2tl'], resdict['v2tu']], [resdict['v2rl'], resdict['v2ru']]]
     for i,p in enumerate(errors):
-        plt.fill_between(args.edges, p[0], p[1], alpha=.5) 
+        ax[2].fill_between(args.edges, p[0], p[1], alpha=.5, rasterized=True) 
 
-    plt.ylim(bottom=0)
-    plt.legend(loc=2)
-    plt.xlabel('Radius (arcsec)')
-    plt.ylabel(r'$v$ (km/s)')
-    plt.title('Velocity Profiles')
+    ax[2].set_ylim(bottom=0)
+    ax[2].legend(loc=2)
+    ax[2].set_xlabel('Radius (arcsec)')
+    ax[2].set_ylabel(r'$v$ (km/s)')
+    ax[2].set_title('Velocity Profiles')
 
     #dispersion profile
-    plt.subplot(3,4,4)
-    plt.plot(args.edges, resdict['sig'])
-    plt.fill_between(args.edges, resdict['sigl'], resdict['sigu'], alpha=.5)
-    plt.ylim(bottom=0)
-    plt.title('Velocity Dispersion Profile')
-    plt.xlabel('Radius (arcsec)')
-    plt.ylabel(r'$v$ (km/s)')
-
-    #MaNGA Ha velocity field
-    plt.subplot(3,4,5)
-    plt.title(f"{resdict['type']} Velocity Data")
-    vmax = min(np.max(np.abs(vel_r)), 300)
-    plt.imshow(vel_r, cmap='jet', origin='lower', vmin=-vmax, vmax=vmax)
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    cb = plt.colorbar(cax=cax)
-    cb.set_label('km/s', labelpad=-10)
-
-    #Vel model from dynesty fit
-    plt.subplot(3,4,6)
-    plt.title('Velocity Model')
-    plt.imshow(velmodel,'jet', origin='lower', vmin=-vmax, vmax=vmax) 
-    plt.tick_params(left=False, bottom=False,labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    plt.colorbar(label='km/s', cax=cax)
-    cb = plt.colorbar(cax=cax)
-    cb.set_label('km/s', labelpad=-10)
-
-    #Residuals from vel fit
-    plt.subplot(3,4,7)
-    plt.title('Velocity Residuals')
-    resid = vel_r - velmodel
-    vmax = min(np.abs(vel_r-velmodel).max(), 50)
-    plt.imshow(vel_r-velmodel, 'jet', origin='lower', vmin=-vmax, vmax=vmax)
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    plt.colorbar(label='km/s', cax=cax)
-    cb = plt.colorbar(cax=cax)
-    cb.set_label('km/s', labelpad=-10)
-
-    #Chisq from vel fit
-    plt.subplot(3,4,8)
-    plt.title('Velocity Chi Squared')
-    velchisq = (vel_r - velmodel)**2 * args.remap('vel_ivar')
-    plt.imshow(velchisq, 'jet', origin='lower', vmin=0, vmax=50)
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    plt.colorbar(cax=cax)
-
-    #MaNGA Ha velocity disp
-    plt.subplot(3,4,9)
-    plt.title(f"{resdict['type']} Dispersion Data")
-    vmax = min(np.max(sig_r), 200)
-    plt.imshow(sig_r, cmap='jet', origin='lower', vmax=vmax, vmin=0)
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    cb = plt.colorbar(cax=cax)
-    cb.set_label('km/s', labelpad=0)
-
-    #disp model from dynesty fit
-    plt.subplot(3,4,10)
-    plt.title('Dispersion Model')
-    plt.imshow(sigmodel, 'jet', origin='lower', vmin=0, vmax=vmax) 
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    cb = plt.colorbar(cax=cax)
-    cb.set_label('km/s', labelpad=0)
-
-    #Residuals from disp fit
-    plt.subplot(3,4,11)
-    plt.title('Dispersion Residuals')
-    resid = sig_r - sigmodel
-    vmax = min(np.abs(sig_r - sigmodel).max(), 50)
-    plt.imshow(sig_r-sigmodel, 'jet', origin='lower', vmin=-vmax, vmax=vmax)
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    cb = plt.colorbar(cax=cax)
-    cb.set_label('km/s', labelpad=-10)
-
-    #Chisq from sig fit
-    plt.subplot(3,4,12)
-    plt.title('Dispersion Chi Squared')
-    sigchisq = (sig_r - sigmodel)**2 * args.remap('sig_ivar')
-    plt.imshow(sigchisq, 'jet', origin='lower', vmin=0, vmax=50)
-    plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
-    cax = mal(plt.gca()).append_axes('right', size='5%', pad=.05)
-    plt.colorbar(cax=cax)
-
-    plt.tight_layout()
+    ax[3].plot(args.edges, resdict['sig'])
+    ax[3].fill_between(args.edges, resdict['sigl'], resdict['sigu'], alpha=.5, rasterized=True)
+    ax[3].set_ylim(bottom=0)
+    ax[3].set_title('Velocity Dispersion Profile')
+    ax[3].set_xlabel('Radius (arcsec)')
+    ax[3].set_ylabel(r'$v$ (km/s)')
+
+    #velocity and dispersion maps: data, model, residuals, and chisq
+    velmax = min(np.max(np.abs(vel_r)), 300)
+    velrmax = min(np.abs(velresid).max(), 50)
+    sigmax = min(np.max(sig_r), 200)
+    sigrmax = min(np.abs(sigresid).max(), 50)
+    maps = [(vel_r, f"{resdict['type']} Velocity Data", -velmax, velmax, -10),
+            (velmodel, 'Velocity Model', -velmax, velmax, -10),
+            (velresid, 'Velocity Residuals', -velrmax, velrmax, -10),
+            (velchisq, 'Velocity Chi Squared', 0, 50, None),
+            (sig_r, f"{resdict['type']} Dispersion Data", 0, sigmax, 0),
+            (sigmodel, 'Dispersion Model', 0, sigmax, 0),
+            (sigresid, 'Dispersion Residuals', -sigrmax, sigrmax, -10),
+            (sigchisq, 'Dispersion Chi Squared', 0, 50, None)]
+    for a, (m, title, vmin, vmax, labelpad) in zip(ax[4:], maps):
+        a.set_title(title)
+        im = a.imshow(m, cmap='jet', origin='lower', vmin=vmin, vmax=vmax, rasterized=True)
+        a.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
+        cax = mal(a).append_axes('right', size='5%', pad=.05)
+        cb = fig.colorbar(im, cax=cax)
+        if labelpad is not None: cb.set_label('km/s', labelpad=labelpad)
+
+    fig.tight_layout()
 
     if save:
         path = f[:f.rfind('/')+1]
         fname = f[f.rfind('/')+1:-5]
-        plt.savefig(f'{path}plots/{fname}.pdf', format='pdf')
-        plt.close()
+        fig.savefig(f'{path}plots/{fname}.pdf', format='pdf', dpi=dpi)
+        plt.close(fig)
 
     return fig
 
 def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None, cen=True,
-        fixcent=True, save=False, clobber=False, remotedir=None, gal=None, relative_pab=False, cmap='RdBu'):
+        fixcent=True, save=False, clobber=False, remotedir=None, gal=None, relative_pab=False, cmap='RdBu',
+        dpi=200):
     """
     Make a plot `nirvana` output file with the different velocity components
     searated.
@@ -558,7 +548,9 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
             gas.
         cen (:obj:`bool`, optional):
             Flag for whether the position of the center was fit.
-        
+        dpi (:obj:`int`, optional):
+            Resolution used for the rasterized image panels when the plot is
+            saved. Only matters if `save=True`.
     """
 
     args, resdict = fileprep(f, plate, ifu, smearing, stellar, maxr, cen, fixcent, remotedir=remotedir, gal=gal)
@@ -608,13 +600,13 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
 
     #image
     plt.subplot(3,5,2)
-    plt.imshow(args.image)
+    plt.imshow(args.image, rasterized=True)
     plt.axis('off')
 
     #MaNGA Ha velocity field
     plt.subplot(3,5,3)
     plt.title(r'Velocity Data')
-    plt.imshow(vel_r, cmap='RdBu', origin='lower', vmin=-datavmax, vmax=datavmax)
+    plt.imshow(vel_r, cmap='RdBu', origin='lower', vmin=-datavmax, vmax=datavmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
     cb = plt.colorbar(cax=cax, orientation='horizontal')
@@ -629,7 +621,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
 
     errors = [[resdict['vtl'], resdict['vtu']], [resdict['v2tl'], resdict['v2tu']], [resdict['v2rl'], resdict['v2ru']]]
     for i,p in enumerate(errors):
-        plt.fill_between(args.edges, p[0], p[1], alpha=.5) 
+        plt.fill_between(args.edges, p[0], p[1], alpha=.5, rasterized=True) 
     plt.ylim(bottom=0)
     plt.legend(loc=2)
     plt.xlabel('Radius (arcsec)', labelpad=-1)
@@ -638,7 +630,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     plt.gca().tick_params(direction='in')
 
     plt.subplot(3,5,6)
-    plt.imshow(velmodel, cmap = 'RdBu', origin='lower', vmin=-datavmax, vmax=datavmax)
+    plt.imshow(velmodel, cmap = 'RdBu', origin='lower', vmin=-datavmax, vmax=datavmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     #plt.text(1.15,.5,'=', transform=plt.gca().transAxes, size=30)
     plt.title(r'$V$', fontsize=16)
@@ -648,7 +640,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,7)
-    plt.imshow(vtmodel, cmap = 'RdBu', origin='lower', vmin=-vtvmax, vmax=vtvmax)
+    plt.imshow(vtmodel, cmap = 'RdBu', origin='lower', vmin=-vtvmax, vmax=vtvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     #plt.text(1.15,.5,'+', transform=plt.gca().transAxes, size=30)
     plt.title(r'$V_t$', fontsize=16)
@@ -658,7 +650,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,8)
-    plt.imshow(v2tmodel, cmap = 'RdBu', origin='lower', vmin=-v2tvmax, vmax=v2tvmax)
+    plt.imshow(v2tmodel, cmap = 'RdBu', origin='lower', vmin=-v2tvmax, vmax=v2tvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     #plt.text(1.15,.5,'+', transform=plt.gca().transAxes, size=30)
     plt.title(r'$V_{2t}$', fontsize=16)
@@ -668,7 +660,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,9)
-    plt.imshow(v2rmodel, cmap = 'RdBu', origin='lower', vmin=-v2rvmax, vmax=v2rvmax)
+    plt.imshow(v2rmodel, cmap = 'RdBu', origin='lower', vmin=-v2rvmax, vmax=v2rvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'$V_{2r}$', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -677,7 +669,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,10)
-    plt.imshow(v2model, cmap = 'RdBu', origin='lower', vmin=-v2vmax, vmax=v2vmax)
+    plt.imshow(v2model, cmap = 'RdBu', origin='lower', vmin=-v2vmax, vmax=v2vmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'$V_{2t} + V_{2r}$', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -686,7 +678,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,11)
-    plt.imshow(velresid, cmap='RdBu', origin='lower', vmin=-velvmax, vmax=velvmax)
+    plt.imshow(velresid, cmap='RdBu', origin='lower', vmin=-velvmax, vmax=velvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'Data $-$ V', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -695,7 +687,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,12)
-    plt.imshow(vtresid, cmap='RdBu', origin='lower', vmin=-vtvmax, vmax=vtvmax)
+    plt.imshow(vtresid, cmap='RdBu', origin='lower', vmin=-vtvmax, vmax=vtvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'Data$- (V_{2t} + V_{2r})$', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -704,7 +696,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,13)
-    plt.imshow(v2tresid, cmap='RdBu', origin='lower', vmin=-v2tvmax, vmax=v2tvmax)
+    plt.imshow(v2tresid, cmap='RdBu', origin='lower', vmin=-v2tvmax, vmax=v2tvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'Data$- (V_t + V_{2r})$', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -713,7 +705,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,14)
-    plt.imshow(v2rresid, cmap='RdBu', origin='lower', vmin=-v2rvmax, vmax=v2rvmax)
+    plt.imshow(v2rresid, cmap='RdBu', origin='lower', vmin=-v2rvmax, vmax=v2rvmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'Data$- (V_t + V_{2t})$', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -722,7 +714,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     cb.set_label('km/s', labelpad=-2)
 
     plt.subplot(3,5,15)
-    plt.imshow(v2resid, cmap='RdBu', origin='lower', vmin=-v2vmax, vmax=v2vmax)
+    plt.imshow(v2resid, cmap='RdBu', origin='lower', vmin=-v2vmax, vmax=v2vmax, rasterized=True)
     plt.tick_params(left=False, bottom=False, labelleft=False, labelbottom=False)
     plt.title(r'Data$- V_t$', fontsize=16)
     cax = mal(plt.gca()).append_axes('bottom', size='5%', pad=0)
@@ -735,7 +727,7 @@ def separate_components(f, plate=None, ifu=None, smearing=True, stellar=False, m
     if save:
         path = f[:f.rfind('/')+1]
         fname = f[f.rfind('/')+1:-5]
-        plt.savefig(f'{path}plots/sepcomp_{fname}.pdf', format='pdf')
+        plt.savefig(f'{path}plots/sepcomp_{fname}.pdf', format='pdf', dpi=dpi)
         plt.close()
 
 def sinewave(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None, cen=True): 
@@ -778,8 +770,13 @@ def sinewave(f, plate=None, ifu=None, smearing=True, stellar=False, maxr=None, c
     plt.title(f"{resdict['plate']}-{resdict['ifu']} {resdict['type']}")
 
     #for each radial bin, plot data points and model
+    cut = np.empty(r.shape, dtype=bool)
+    inner = np.empty(r.shape, dtype=bool)
+    outer = np.empty(r.shape, dtype=bool)
     for i in range(len(args.edges)-1):
-        cut = (r > args.edges[i]) * (r < args.edges[i+1])
+        np.greater(r, args.edges[i], out=inner)
+        np.less(r, args.edges[i+1], out=outer)
+        np.logical_and(inner, outer, out=cut)
         sort = np.argsort(th[cut])
         thcs = th[cut][sort]
         plt.plot(np.degrees(thcs), args.vel[cut][sort]+100*i, '.', c=c[i])
@@ -813,7 +810,19 @@ def safeplot(f, func='sum', **kwargs):
         print(f, 'failed')
         print(traceback.format_exc())
 
-def plotdir(directory='/data/manga/digiorgio/nirvana/', fname='*-*_*.nirv', cores=20, func='sum', **kwargs):
+def _init_plot_worker(backend):
+    '''
+    Set up the matplotlib state of a :func:`plotdir` worker process.
+
+    Args:
+        backend (:obj:`str`):
+            Matplotlib backend to use. If None, the current backend is used.
+    '''
+    if backend is not None: matplotlib.use(backend)
+    plt.ioff() #turn off plot displaying (don't know if this works in a script)
+
+def plotdir(directory='/data/manga/digiorgio/nirvana/', fname='*-*_*.nirv', cores=20, func='sum',
+            backend='Agg', **kwargs):
     '''
     Make summaryplots of an entire directory of output files.
 
@@ -835,22 +844,42 @@ def plotdir(directory='/data/manga/digiorgio/nirvana/', fname='*-*_*.nirv', core
             many cores and don't call `plt.ioff()` before this, this function
             may crash the desktop environment of your operating system because
             it tries to open too many windows at once.
+        backend (:obj:`str`, optional):
+            Matplotlib backend to use while making the plots. The default
+            non-interactive Agg backend is the fastest for writing plot files
+            and never opens any windows. The backend is only set in the
+            worker processes, so the backend and any open figures of the
+            calling session are not affected; the workers are spawned, so
+            scripts calling this function need an ``if __name__ ==
+            '__main__':`` guard. If None, the current backend is used.
         kwargs (optional):
             Arguments for `~nirvana.plotting.summaryplot`.
     '''
 
-    plt.ioff() #turn off plot displaying (don't know if this works in a script)
     fs = glob(directory + fname)
     if len(fs) == 0: raise FileNotFoundError('No files found')
     else: print(len(fs), 'files found')
-    with mp.Pool(cores) as p:
+
+    #the backend is only set in the worker processes. Switching it here would
+    #close all of the caller's open figures. Fresh (spawned) workers are used
+    #so that they don't inherit, and then close, copies of those figures.
+    ctx = mp.get_context() if backend is None else mp.get_context('spawn')
+    with ctx.Pool(cores, initializer=_init_plot_worker, initargs=(backend,)) as p:
         p.map(partial(safeplot, func=func), fs)
 
-def infobox(plot, resdict, args, cen=True, relative_pab=False):
-    #generate velocity models
-    velmodel, sigmodel = bisym_model(args,resdict,plot=True,relative_pab=relative_pab)
-    vel_r = args.remap('vel')
-    sig_r = np.sqrt(args.remap('sig_phys2')) if hasattr(args, 'sig_phys2') else args.remap('sig')
+def infobox(plot, resdict, args, cen=True, relative_pab=False, velmodel=None, sigmodel=None,
+            vel_r=None, sig_r=None, velchisq=None, sigchisq=None):
+    #compute the chisq maps if they weren't provided, generating the velocity
+    #models and remapping the data only if needed
+    if velchisq is None or sigchisq is None:
+        if velmodel is None or sigmodel is None:
+            velmodel, sigmodel = bisym_model(args,resdict,plot=True,relative_pab=relative_pab)
+        if vel_r is None: vel_r = args.remap('vel')
+        if sig_r is None:
+            sig_r = np.sqrt(args.remap('sig_phys2')) if hasattr(args, 'sig_phys2') \
+                        else args.remap('sig')
+        velchisq = (vel_r - velmodel)**2 * args.remap('vel_ivar')
+        sigchisq = (sig_r - sigmodel)**2 * args.remap('sig_ivar')
 
     #calculate number of variables
     if 'velmask' in resdict:
@@ -861,8 +890,8 @@ def infobox(plot, resdict, args, cen=True, relative_pab=False):
     nvar = len(args.vel) + len(args.sig) - lenmeds
 
     #calculate reduced chisq for vel and sig
-    rchisqv = np.sum((vel_r - velmodel)**2 * args.remap('vel_ivar')) / nvar
-    rchisqs = np.sum((sig_r - sigmodel)**2 * args.remap('sig_ivar')) / nvar
+    rchisqv = np.sum(velchisq) / nvar
+    rchisqs = np.sum(sigchisq) / nvar
 
     #print global parameters on figure
     plot.axis('off')
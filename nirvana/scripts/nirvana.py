@@ -155,8 +155,10 @@ def main(args):
                   remotedir=args.remote, mock=mock, penalty=args.penalty)
 
     #write out with sampler results or just FITS table
-    pickle.dump(samp.results, open(fname, 'wb'))
-    pickle.dump(gal, open(galname, 'wb'))
+    with open(fname, 'wb') as fh:
+        pickle.dump(samp.results, fh)
+    with open(galname, 'wb') as fh:
+        pickle.dump(gal, fh)
     if args.fits: 
         try:
             imagefits(fname, galmeta, gal, outfile=fitsname, remotedir=args.remote) 
@@ -7,6 +7,7 @@ from scipy import stats, special
 from nirvana.data import manga
 from nirvana.data import util
 from nirvana.data import scatter
+from nirvana.data.kinematics import Kinematics
 from nirvana.tests.util import remote_data_file, requires_remote
 from nirvana.models.oned import HyperbolicTangent, Exponential
 from nirvana.models.axisym import AxisymmetricDisk
@@ -29,6 +30,11 @@ def test_disk():
 
     assert numpy.isclose(vel[n//2,n//2], _vel[n//2,n//2]), 'Smearing moved the center.'
 
+    # Passing the same beam again should reuse its FFT
+    beam_fft = disk.beam_fft
+    disk.model(disk.par, beam=beam)
+    assert disk.beam_fft is beam_fft, 'Beam FFT should not have been recomputed.'
+
 
 def test_disk_derivative_nosig():
     disk = AxisymmetricDisk()
@@ -155,6 +161,69 @@ def test_disk_derivative():
                 f'Finite difference produced different sigma derivative for parameter {i+1}!'
 
 
+def test_disk_resid_derivative():
+    disk = AxisymmetricDisk(rc=HyperbolicTangent(), dc=Exponential())
+
+    # Offset the center and use a slowly rising rotation curve (see
+    # test_disk_derivative)
+    disk.par[:2] = 0.1
+    disk.par[-3] = 20.
+
+    # Finite difference test steps
+    #                 x0      y0      pa     inc    vsys   vinf   hv      sig0   hsig
+    dp = numpy.array([0.0001, 0.0001, 0.001, 0.001, 0.001, 0.001, 0.0001, 0.001, 0.0001])
+
+    # Build mock kinematics offset from the current parameters so that the
+    # residuals are non-zero
+    n = 31
+    x = numpy.arange(n, dtype=float)[::-1] - n//2
+    y = numpy.arange(n, dtype=float) - n//2
+    x, y = numpy.meshgrid(x, y)
+    p = disk.par.copy()
+    p_data = disk.par.copy()
+    p_data[5] *= 1.1
+    p_data[7] *= 0.9
+    vel, sig = disk.model(p_data, x=x, y=y)
+    kin = Kinematics(vel, x=x, y=y, grid_x=x, grid_y=y, sb=numpy.ones_like(vel), sig=sig,
+                     quiet=True)
+
+    # Run the fit preparation without errors so that the unweighted residuals
+    # and their derivatives are used
+    disk._fit_prep(kin, p, None, None, False, True, True, None)
+    assert disk._get_jac() == disk._deriv_resid, 'Should use the unweighted residuals'
+
+    resid = disk._resid(p)
+    dresid = disk._deriv_resid(p)
+    assert dresid.shape == (resid.size, p.size), 'Bad Jacobian shape'
+
+    # Make sure the dispersion residuals are included
+    vresid, sresid = disk._resid(p, sep=True)
+    dvresid, dsresid = disk._deriv_resid(p, sep=True)
+    assert vresid.size == kin.vel.size and sresid.size == kin.sig.size, \
+            'Both velocity and dispersion residuals should be included'
+    assert resid.size == vresid.size + sresid.size, 'Bad number of residuals'
+    assert numpy.any(sresid != 0), 'Dispersion residuals should be non-zero'
+    assert dsresid.shape == (sresid.size, p.size), 'Bad dispersion Jacobian shape'
+    assert numpy.all(dvresid[:,-2:] == 0), \
+            'Velocity residuals should not depend on the dispersion parameters'
+    assert numpy.all(numpy.any(dsresid[:,-2:] != 0, axis=0)), \
+            'Dispersion residuals should depend on the dispersion parameters'
+
+    # Brute force it
+    residp = numpy.empty(dresid.shape, dtype=float)
+    for i in range(p.size):
+        _p = p.copy()
+        _p[i] += dp[i]
+        residp[...,i] = disk._resid(_p)
+    disk._set_par(p)
+
+    # Compare them
+    fd_dresid = (residp - resid[...,None])/dp[None,:]
+    for i in range(p.size):
+        assert numpy.allclose(dresid[...,i], fd_dresid[...,i], rtol=1e-3, atol=1e-3), \
+                f'Finite difference produced different residual derivative for parameter {i+1}!'
+
+
 @requires_remote
 def test_disk_derivative_bin():
 
@@ -0,0 +1,32 @@
+
+import numpy
+
+from nirvana.data.util import get_map_bin_transformations
+
+
+def test_bin_transformations():
+    rng = numpy.random.default_rng(99)
+    binid = rng.integers(-1, 30, size=(20,20))
+    # Make the bin numbers non-sequential
+    binid[binid == 5] = -1
+    binid[binid == 7] = 100
+
+    ubinid, nbin, ubin_indx, grid_indx, bin_inverse, bin_transform \
+            = get_map_bin_transformations(binid=binid)
+
+    assert numpy.array_equal(nbin, numpy.squeeze(numpy.asarray(numpy.sum(bin_transform > 0,
+                                                                          axis=1)))), \
+            'Bad number of spaxels per bin'
+    assert numpy.array_equal(ubinid, binid.flat[ubin_indx]), 'Bad unique bin indices'
+    _binid = numpy.full(binid.shape, -1, dtype=int)
+    _binid[numpy.unravel_index(grid_indx, binid.shape)] = ubinid[bin_inverse]
+    assert numpy.array_equal(binid, _binid), 'Bad grid/inverse indices'
+    assert numpy.allclose(ubinid, bin_transform.dot(binid.ravel())), 'Bad transform'
+    assert numpy.allclose(bin_transform.sum(axis=1), 1.), 'Transform should average'
+
+    # Unbinned
+    ubinid, nbin, ubin_indx, grid_indx, bin_inverse, bin_transform \
+            = get_map_bin_transformations(spatial_shape=binid.shape)
+    assert ubinid is None, 'Unique bin IDs should be None'
+    assert numpy.array_equal(bin_transform.toarray(), numpy.identity(binid.size)), \
+            'Transform should be the identity matrix'
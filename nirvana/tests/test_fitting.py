@@ -0,0 +1,50 @@
+
+import pickle
+
+import numpy
+
+from nirvana import fitting
+from nirvana.data.kinematics import Kinematics
+from nirvana.fitting import bisym_model, unpack
+
+
+def test_bisym_cache():
+    nb = 6
+    vt = numpy.linspace(0, 200, nb)
+    v2t = numpy.linspace(0, 20, nb)
+    v2r = numpy.linspace(0, 15, nb)
+    sig = numpy.linspace(80, 40, nb)
+    args = Kinematics.mock(56, 45., 30., 10., 0., vt, v2t, v2r, sig)
+    args.setdisp(True)
+    args.setnglobs(6)
+    args.setfixcent(True)
+    args.edges = numpy.linspace(0, 12, nb)
+
+    par = numpy.concatenate([[45., 30., 10., 5., 0.3, -0.2], vt[1:], v2t[1:], v2r[1:], sig])
+    paramdict = unpack(par, args)
+    vel, _ = bisym_model(args, paramdict)
+    cache = fitting._bisym_geom_cache
+    assert cache is not None, 'Geometry should be cached'
+
+    # A second call with the same geometry reuses the cached geometry
+    _vel, _ = bisym_model(args, paramdict)
+    assert fitting._bisym_geom_cache is cache, 'Cached geometry should be reused'
+    assert numpy.ma.allclose(vel, _vel), 'Cached geometry should give the same model'
+
+    # Changing the geometry invalidates the cache
+    _par = par.copy()
+    _par[0] = 60.
+    _paramdict = unpack(_par, args)
+    _vel, _ = bisym_model(args, _paramdict)
+    assert fitting._bisym_geom_cache is not cache, 'Cache should be replaced'
+    assert fitting._bisym_geom_cache[2] != cache[2], 'Cache should use the new geometry'
+    assert not numpy.ma.allclose(vel, _vel), 'Model should change with the geometry'
+    # ... and the result is the same as without a cached geometry
+    fitting._bisym_geom_cache = None
+    __vel, _ = bisym_model(args, _paramdict)
+    assert numpy.ma.allclose(_vel, __vel), 'Cached geometry should give the same model'
+
+    # The geometry cache should not be carried by the data object
+    assert '_bisym_geom_cache' not in vars(args), 'Geometry cache should not be stored in args'
+    _args = pickle.loads(pickle.dumps(args))
+    assert not hasattr(_args, '_bisym_geom_cache'), 'Pickled args should not include the cache'
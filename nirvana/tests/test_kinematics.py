@@ -0,0 +1,94 @@
+
+import pickle
+
+import numpy
+from matplotlib import pyplot
+
+from nirvana.data.kinematics import Kinematics
+
+
+def binned_kinematics():
+    # Pairs of pixels in each row are binned together, and the first row is
+    # excluded
+    n = 6
+    x, y = numpy.meshgrid(numpy.arange(n, dtype=float) - n//2,
+                          numpy.arange(n, dtype=float) - n//2)
+    binid = numpy.arange(n*n).reshape(n,n)//2
+    binid[0,:] = -1
+    vel = binid.astype(float)
+    return Kinematics(vel, x=x, y=y, grid_x=x, grid_y=y, sb=numpy.ones_like(vel),
+                      sig=numpy.ones_like(vel), binid=binid, quiet=True)
+
+
+def test_remap_masked():
+    kin = binned_kinematics()
+    assert kin.vel.size == 15, 'Bad number of bins'
+
+    # Mask two of the bins
+    vel = numpy.ma.MaskedArray(kin.vel.copy())
+    vel[[0,3]] = numpy.ma.masked
+    vel_map = kin.remap(vel)
+    assert numpy.sum(vel_map.mask) == 10, 'Mask of the input array should be kept'
+    assert numpy.all(vel_map.mask[0]), 'Pixels without data should be masked'
+    assert numpy.all(vel_map.mask[1,:2]), 'First masked bin should be masked'
+    assert numpy.all(vel_map.mask[2,:2]), 'Second masked bin should be masked'
+    assert numpy.array_equal(vel_map.compressed(), numpy.repeat(kin.vel[~vel.mask], 2)), \
+                'Bad remapped data'
+
+    # The provided mask is combined with the mask of the input array
+    mask = numpy.zeros(kin.vel.shape, dtype=bool)
+    mask[-1] = True
+    vel_map = kin.remap(vel, mask=mask)
+    assert numpy.sum(vel_map.mask) == 12, 'Both masks should be applied'
+
+
+def test_bin_masked():
+    n = 6
+    x, y = numpy.meshgrid(numpy.arange(n, dtype=float) - n//2,
+                          numpy.arange(n, dtype=float) - n//2)
+    vel = x + y
+    kin = Kinematics(vel, x=x, y=y, grid_x=x, grid_y=y, sb=numpy.ones_like(vel),
+                     sig=numpy.ones_like(vel), quiet=True)
+    assert kin.binid is None, 'Data should be unbinned'
+
+    # Binning masked maps should return plain arrays, as for binned data
+    model = numpy.ma.MaskedArray(vel.copy(), mask=x > 0)
+    deriv = numpy.ma.MaskedArray(numpy.stack((x, y), axis=-1),
+                                 mask=numpy.repeat((x > 0)[...,None], 2, axis=-1))
+    _model = kin.bin(model)
+    assert not isinstance(_model, numpy.ma.MaskedArray), 'Should not return a masked array'
+    assert numpy.array_equal(_model, vel.ravel()), 'Bad binned data'
+    _model, _deriv = kin.deriv_bin(model, deriv)
+    assert not isinstance(_model, numpy.ma.MaskedArray), 'Should not return a masked array'
+    assert not isinstance(_deriv, numpy.ma.MaskedArray), 'Should not return a masked array'
+    assert _deriv.shape == (n*n, 2), 'Bad derivative shape'
+    assert numpy.array_equal(_deriv[:,0], x.ravel()), 'Bad binned derivative'
+    # The returned vector should not be a view of the input
+    _model = kin.bin(vel)
+    _model[0] = 100.
+    assert vel[0,0] != 100., 'Binned data should be a copy'
+
+    # The same is true for binned data
+    kin = binned_kinematics()
+    _model = kin.bin(model)
+    assert not isinstance(_model, numpy.ma.MaskedArray), 'Should not return a masked array'
+
+
+def test_image_pickle(tmp_path):
+    image = numpy.linspace(0, 1, 48, dtype=numpy.float32).reshape(4,4,3)
+    ofile = tmp_path / 'image.png'
+    pyplot.imsave(ofile, image)
+
+    n = 6
+    x, y = numpy.meshgrid(numpy.arange(n, dtype=float) - n//2,
+                          numpy.arange(n, dtype=float) - n//2)
+    vel = x + y
+    kin = Kinematics(vel, x=x, y=y, grid_x=x, grid_y=y, sb=numpy.ones_like(vel),
+                     sig=numpy.ones_like(vel), image=str(ofile), quiet=True)
+
+    # Pickling reads the image so that it no longer depends on the file
+    _kin = pickle.loads(pickle.dumps(kin))
+    ofile.unlink()
+    assert isinstance(_kin.image, numpy.ndarray), 'Image should have been read'
+    assert _kin.image.shape[:2] == (4,4), 'Bad image shape'
+    assert numpy.array_equal(_kin.image, kin.image), 'Image changed'
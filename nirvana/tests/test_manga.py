@@ -152,6 +152,13 @@ def test_files():
     assert files[2].split('.')[0] == '12704', 'Image file name changed'
 
 
+def test_maps_bintype():
+    maps_file = manga.manga_file_names(8138, 12704, daptype='VOR10-MILESHC-MASTARHC2')[-1]
+    assert manga.manga_maps_bintype(maps_file) == 'VOR10', 'Bad bintype'
+    assert manga.manga_maps_bintype('/path/with-dash/{0}'.format(maps_file)) == 'VOR10', \
+            'Path should not affect bintype'
+
+
 @requires_remote
 def test_sbholes():
     maps_file = remote_data_file('manga-8138-12704-MAPS-{0}.fits.gz'.format(dap_test_daptype))
@@ -0,0 +1,17 @@
+
+import numpy
+import dynesty
+
+from nirvana.plotting import weighted_quantiles
+
+
+def test_weighted_quantiles():
+    rng = numpy.random.default_rng(99)
+    samps = rng.normal(size=(1000,5))
+    weights = rng.uniform(size=1000)
+    qs = [.5, .5-.6826/2, .5+.6826/2]
+    q = weighted_quantiles(samps, weights, qs)
+    assert q.shape == (3,5), 'Bad shape'
+    for i in range(samps.shape[1]):
+        assert numpy.allclose(q[:,i], dynesty.utils.quantile(samps[:,i], qs, weights=weights)), \
+                'Should match dynesty'